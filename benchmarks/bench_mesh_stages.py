@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Benchmark: every CPU mesh stage in img2stl.py on synthetic meshes.
+
+Meshes come from synthetic.make_mesh — spheres with punched holes, flipped
+patches, floater fragments and non-manifold fins — so no GPU or Hunyuan3D
+weights are needed. Each (size, stage) runs in a fresh subprocess; the RSS
+high-water mark is reset after the input mesh is built, so the reported
+peak is what the stage itself added.
+
+Results are JSON with the commit, library versions and per-stage numbers,
+so runs can be diffed across commits with --compare.
+
+Usage:
+    python benchmarks/bench_mesh_stages.py                          # 100k, 1M, 5M
+    python benchmarks/bench_mesh_stages.py --faces 200000 --stages repair_mesh
+    python benchmarks/bench_mesh_stages.py --json new.json --compare old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from memstat import peak_rss_mb, reset_peak_rss, rss_mb
+
+STAGES = ('weld_vertices', 'check_edges', 'remove_small_components', 'postprocess_mesh',
+          'decimate_mesh', 'repair_mesh', 'write_stl', 'export_glb',
+          'export_web_glb')
+
+
+def _run_stage(stage: str, mesh) -> tuple:
+    """Run one stage; returns (output mesh or None, extra result fields)."""
+    import img2stl
+
+    if stage == 'weld_vertices':
+        report = {}
+        out = img2stl.weld_vertices(mesh, report=report)
+        return out, {'vertices_merged': report['vertices_merged']}
+    if stage == 'check_edges':
+        return None, img2stl.check_edges(mesh)
+    if stage == 'remove_small_components':
+        return img2stl.remove_small_components(mesh), {}
+    if stage == 'postprocess_mesh':
+        return img2stl.postprocess_mesh(mesh), {}
+    if stage == 'decimate_mesh':
+        return img2stl.decimate_mesh(mesh, target_faces=len(mesh.faces) // 4), {}
+    if stage == 'repair_mesh':
+        report = {}
+        out = img2stl.repair_mesh(mesh, report=report)
+        ran = [s['stage'] for s in report['stages'] if s['ran']]
+        return out, {'stages_run': ran, 'watertight': report['post']['watertight']}
+
+    suffix = '.stl' if stage == 'write_stl' else '.glb'
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        if stage == 'write_stl':
+            img2stl.write_stl(mesh, path)
+        elif stage == 'export_web_glb':
+            img2stl.write_preview_glb(mesh, path)
+        else:
+            mesh.export(path)
+        return None, {'file_mb': round(os.path.getsize(path) / 1e6, 1)}
+    finally:
+        os.remove(path)
+
+
+def run_one(stage: str, faces: int, repeat: int) -> dict:
+    """Build the synthetic mesh, run one stage `repeat` times, report time and RSS."""
+    import synthetic
+
+    source = synthetic.make_mesh(faces)
+    times, extra, out = [], {}, None
+    for _ in range(repeat):
+        mesh = source.copy()
+        baseline = rss_mb()
+        reset_peak_rss()
+        t0 = time.perf_counter()
+        out, extra = _run_stage(stage, mesh)
+        times.append(time.perf_counter() - t0)
+        peak = peak_rss_mb() - baseline
+        del mesh
+
+    return {
+        'stage': stage,
+        'faces_in': len(source.faces),
+        'faces_out': len(out.faces) if out is not None else None,
+        'time_s': round(statistics.median(times), 4),
+        'time_min_s': round(min(times), 4),
+        'peak_rss_delta_mb': round(peak, 1),
+        **extra,
+    }
+
+
+def _environment() -> dict:
+    def version(mod):
+        try:
+            return __import__(mod).__version__
+        except Exception:
+            return None
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': version('numpy'),
+        'trimesh': version('trimesh'),
+    }
+
+
+def _compare(results: list, old_path: str) -> None:
+    with open(old_path) as f:
+        old = {(r['stage'], r['faces_in']): r for r in json.load(f)['results']}
+    print(f"\n  vs {old_path}")
+    print(f"  {'Stage':<24} {'Faces':>10} {'Time':>14} {'Peak RSS':>16}")
+    for r in results:
+        o = old.get((r['stage'], r['faces_in']))
+        if not o:
+            continue
+        ratio = r['time_s'] / o['time_s'] if o['time_s'] else float('nan')
+        print(f"  {r['stage']:<24} {r['faces_in']:>10,} "
+              f"{o['time_s']:>6.2f}→{r['time_s']:<6.2f}{ratio:.2f}x "
+              f"{o['peak_rss_delta_mb']:>7.0f}→{r['peak_rss_delta_mb']:.0f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--faces', type=int, nargs='+',
+                        default=[100_000, 1_000_000, 5_000_000],
+                        help='Approximate face counts of the synthetic meshes')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help='Stages to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Runs per stage; the median time is reported')
+    parser.add_argument('--json', default=None, metavar='FILE',
+                        help='Also write results as JSON')
+    parser.add_argument('--compare', default=None, metavar='FILE',
+                        help='Print time/RSS ratios against an earlier --json file')
+    parser.add_argument('--child', nargs=3, metavar=('STAGE', 'FACES', 'REPEAT'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        stage, faces, repeat = args.child
+        print(json.dumps(run_one(stage, int(faces), int(repeat))))
+        return
+
+    results = []
+    print(f"  {'Stage':<24} {'Faces in':>10} {'Faces out':>10} {'Time':>9} {'Peak RSS':>10}")
+    print(f"  {'-'*24} {'-'*10} {'-'*10} {'-'*9} {'-'*10}")
+    for faces in args.faces:
+        for stage in args.stages:
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', stage, str(faces), str(args.repeat)],
+                capture_output=True, text=True,
+            )
+            if out.returncode != 0:
+                err = (out.stderr.strip().splitlines() or ['?'])[-1]
+                print(f"  {stage:<24} {faces:>10,}  FAILED: {err}")
+                results.append({'stage': stage, 'faces_in': faces, 'error': err})
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(r)
+            faces_out = f"{r['faces_out']:,}" if r['faces_out'] is not None else '-'
+            print(f"  {r['stage']:<24} {r['faces_in']:>10,} {faces_out:>10} "
+                  f"{r['time_s']:>8.3f}s {r['peak_rss_delta_mb']:>8.1f}MB")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'environment': _environment(), 'results': results}, f, indent=2)
+    if args.compare:
+        _compare([r for r in results if 'error' not in r], args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark: img2stl.write_stl vs trimesh's STL export.
+
+Each exporter runs in a fresh subprocess. After the test mesh is built the
+kernel's RSS high-water mark is reset (Linux /proc/self/clear_refs), so the
+reported peak is what the export itself added on top of the mesh.
+Runs on CPU only — no GPU or Hunyuan3D weights needed.
+
+Usage:
+    python benchmarks/bench_stl_export.py                  # default sizes
+    python benchmarks/bench_stl_export.py --subdiv 7 8 9   # icosphere levels
+    python benchmarks/bench_stl_export.py --json out.json  # machine-readable
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from memstat import peak_rss_mb, reset_peak_rss, rss_mb
+
+METHODS = ('trimesh', 'write_stl')
+
+
+def run_one(method: str, subdiv: int) -> dict:
+    """Build an icosphere, export it with one method, report time and RSS."""
+    import trimesh
+    import img2stl
+
+    mesh = trimesh.creation.icosphere(subdivisions=subdiv)
+    # Touch the cached arrays trimesh export would otherwise build lazily,
+    # so both methods start from the same baseline.
+    _ = mesh.face_normals
+    baseline = rss_mb()
+    reset_peak_rss()
+
+    fd, path = tempfile.mkstemp(suffix='.stl')
+    os.close(fd)
+    try:
+        t0 = time.perf_counter()
+        if method == 'trimesh':
+            mesh.export(path)
+        else:
+            img2stl.write_stl(mesh, path)
+        elapsed = time.perf_counter() - t0
+        size = os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+    return {
+        'method': method,
+        'faces': len(mesh.faces),
+        'time_s': round(elapsed, 4),
+        'peak_rss_delta_mb': round(peak_rss_mb() - baseline, 1),
+        'file_mb': round(size / 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--subdiv', type=int, nargs='+', default=[7, 8, 9],
+                        help='Icosphere subdivision levels (8 ≈ 1.3M faces)')
+    parser.add_argument('--json', default=None, metavar='FILE',
+                        help='Also write results as JSON')
+    parser.add_argument('--child', nargs=2, metavar=('METHOD', 'SUBDIV'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.child[0], int(args.child[1]))))
+        return
+
+    results = []
+    print(f"  {'Method':<10} {'Faces':>10} {'Time':>9} {'Peak RSS':>10} {'Size':>8}")
+    print(f"  {'-'*10} {'-'*10} {'-'*9} {'-'*10} {'-'*8}")
+    for subdiv in args.subdiv:
+        for method in METHODS:
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', method, str(subdiv)],
+                capture_output=True, text=True, check=True,
+            )
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(r)
+            print(f"  {r['method']:<10} {r['faces']:>10,} {r['time_s']:>8.3f}s "
+                  f"{r['peak_rss_delta_mb']:>8.1f}MB {r['file_mb']:>6.1f}MB")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Benchmark: repair work avoided by welding seam duplicates first.
+
+Builds a clean sphere, splits it into per-block vertex copies with
+synthetic.split_seams (what marching-cubes seams look like), then runs
+repair_mesh twice — straight on the split mesh, and after weld_vertices —
+and reports edge counts, which repair stages ran, and the time each path
+took. Optional --defects adds holes/flips/etc. so repair has real work
+left after welding too. CPU only.
+
+Usage:
+    python benchmarks/bench_weld.py                        # 100k and 500k faces
+    python benchmarks/bench_weld.py --faces 1000000 --blocks 32
+    python benchmarks/bench_weld.py --defects holes flipped --json weld.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import synthetic
+
+
+def _repair(mesh) -> dict:
+    import img2stl
+
+    report = {}
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        img2stl.repair_mesh(mesh, report=report)
+    return {
+        'time_s': round(time.perf_counter() - t0, 3),
+        'stages_run': [s['stage'] for s in report['stages'][1:] if s['ran']],
+        'boundary_edges': report['pre']['boundary_edges'],
+        'watertight': report['post']['watertight'],
+    }
+
+
+def run_one(faces: int, blocks: int, defects: tuple) -> dict:
+    import img2stl
+
+    mesh = synthetic.split_seams(synthetic.make_mesh(faces, defects), blocks=blocks)
+
+    unwelded = _repair(mesh.copy())
+
+    weld = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        welded_mesh = img2stl.weld_vertices(mesh.copy(), report=weld)
+    welded = _repair(welded_mesh)
+
+    return {
+        'faces': len(mesh.faces),
+        'blocks': blocks,
+        'defects': list(defects),
+        'vertices_merged': weld['vertices_merged'],
+        'weld_time_s': weld['time_s'],
+        'unwelded': unwelded,
+        'welded': welded,
+        'stages_avoided': [s for s in unwelded['stages_run'] if s not in welded['stages_run']],
+        'speedup': round(unwelded['time_s'] / max(weld['time_s'] + welded['time_s'], 1e-9), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--faces', type=int, nargs='+', default=[100_000, 500_000],
+                        help='Approximate face counts of the synthetic meshes')
+    parser.add_argument('--blocks', type=int, default=16,
+                        help='Seam grid blocks per axis (default: 16)')
+    parser.add_argument('--defects', nargs='*', default=[], choices=synthetic.DEFECTS,
+                        help='Extra defects to add besides the seams')
+    parser.add_argument('--json', default=None, metavar='FILE',
+                        help='Also write results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    print(f"  {'Faces':>10} {'Merged':>9} {'Boundary':>17} {'Repair time':>22} "
+          f"{'Watertight':>11}  Stages avoided")
+    print(f"  {'-'*10} {'-'*9} {'-'*17} {'-'*22} {'-'*11}  {'-'*14}")
+    for faces in args.faces:
+        r = run_one(faces, args.blocks, tuple(args.defects))
+        results.append(r)
+        u, w = r['unwelded'], r['welded']
+        boundary = f"{u['boundary_edges']:,}→{w['boundary_edges']:,}"
+        timing = (f"{u['time_s']:.2f}s→{r['weld_time_s'] + w['time_s']:.2f}s "
+                  f"({r['speedup']:.1f}x)")
+        tight = f"{'yes' if u['watertight'] else 'no'}→{'yes' if w['watertight'] else 'no'}"
+        print(f"  {r['faces']:>10,} {r['vertices_merged']:>9,} {boundary:>17} "
+              f"{timing:>22} {tight:>11}  {', '.join(r['stages_avoided']) or '-'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Process memory helpers shared by the benchmarks (Linux /proc, with fallbacks)."""
+
+import resource
+
+
+def _status_kb(field: str) -> int | None:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def rss_mb() -> float:
+    """Current RSS in MB."""
+    kb = _status_kb('VmRSS')
+    if kb is None:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / 1024
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS since the last reset, in MB (ru_maxrss is KB on Linux)."""
+    kb = _status_kb('VmHWM')
+    if kb is None:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / 1024
+
+
+def reset_peak_rss() -> None:
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass  # Not Linux — peak then includes everything before the reset
@@ -0,0 +1,124 @@
+"""Synthetic test meshes with the defects Hunyuan3D output tends to have.
+
+make_mesh(faces, defects) builds a UV sphere of roughly the requested face
+count (Y-up, radius 1, like raw generator output) and damages it:
+
+    holes        punched-out caps → boundary edges
+    flipped      patches with reversed winding → inconsistent edges
+    floaters     thousands of tiny detached tetrahedra
+    nonmanifold  extra "fin" triangles on existing edges → 3-face edges
+
+split_seams(mesh) separately mimics marching-cubes seam duplicates: it
+gives every grid block its own jittered copy of the vertices it uses.
+
+Everything is seeded, so a given (faces, defects) pair is reproducible
+across runs and commits.
+"""
+
+import numpy as np
+import trimesh
+
+DEFECTS = ('holes', 'flipped', 'floaters', 'nonmanifold')
+
+
+def uv_sphere(target_faces: int) -> tuple[np.ndarray, np.ndarray]:
+    """Closed, consistently wound lat/long sphere with ~target_faces faces."""
+    cols = max(8, int(round(np.sqrt(target_faces))))
+    rows = max(3, int(round(target_faces / (2 * cols))) + 1)  # latitude bands
+
+    theta = np.linspace(0, np.pi, rows + 1)[1:-1]           # ring polar angles
+    phi = np.linspace(0, 2 * np.pi, cols, endpoint=False)
+    t, p = np.meshgrid(theta, phi, indexing='ij')
+    rings = np.stack([np.sin(t) * np.cos(p), np.cos(t), np.sin(t) * np.sin(p)], -1)
+    vertices = np.vstack([[0, 1, 0], rings.reshape(-1, 3), [0, -1, 0]])
+
+    top, bottom = 0, len(vertices) - 1
+    ring = np.arange((rows - 1) * cols).reshape(rows - 1, cols) + 1
+    nxt = np.roll(ring, -1, axis=1)
+
+    cap_top = np.column_stack([np.full(cols, top), nxt[0], ring[0]])
+    cap_bot = np.column_stack([np.full(cols, bottom), ring[-1], nxt[-1]])
+    a, b, c, d = ring[:-1], nxt[:-1], nxt[1:], ring[1:]
+    quads = np.concatenate([
+        np.stack([a, b, c], -1).reshape(-1, 3),
+        np.stack([a, c, d], -1).reshape(-1, 3),
+    ])
+    return vertices, np.vstack([cap_top, quads, cap_bot]).astype(np.int64)
+
+
+def _random_dirs(rng, n: int) -> np.ndarray:
+    v = rng.normal(size=(n, 3))
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def _in_caps(points: np.ndarray, centers: np.ndarray, cos_radius: float) -> np.ndarray:
+    """Mask of unit-sphere points within any cap, chunked to bound memory."""
+    mask = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(points), 200_000):
+        dots = points[start:start + 200_000] @ centers.T
+        mask[start:start + 200_000] = (dots >= cos_radius).any(axis=1)
+    return mask
+
+
+def make_mesh(target_faces: int, defects=DEFECTS, seed: int = 0,
+              holes: int = 40, flipped: int = 20, floaters: int = 2000,
+              fins: int = 200) -> trimesh.Trimesh:
+    """Build a damaged sphere; defects is any subset of DEFECTS."""
+    rng = np.random.default_rng(seed)
+    vertices, faces = uv_sphere(target_faces)
+    cap = np.cos(0.05)  # ~0.06% of the sphere per cap
+
+    centroids = vertices[faces].mean(axis=1)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    if 'flipped' in defects:
+        flip = _in_caps(centroids, _random_dirs(rng, flipped), cap)
+        faces[flip] = faces[flip][:, ::-1]
+
+    if 'holes' in defects:
+        keep = ~_in_caps(centroids, _random_dirs(rng, holes), cap)
+        faces = faces[keep]
+
+    extra_v, extra_f = [vertices], [faces]
+    base = len(vertices)
+
+    if 'nonmanifold' in defects:
+        picked = faces[rng.choice(len(faces), fins, replace=False)]
+        tips = vertices[picked].mean(axis=1) * 1.02
+        extra_v.append(tips)
+        extra_f.append(np.column_stack([picked[:, 0], picked[:, 1],
+                                        base + np.arange(fins)]))
+        base += fins
+
+    if 'floaters' in defects:
+        tet = np.array([[1, 1, 1], [1, -1, -1], [-1, 1, -1], [-1, -1, 1]]) * 0.004
+        tet_f = np.array([[0, 1, 2], [0, 3, 1], [0, 2, 3], [1, 3, 2]])
+        centers = _random_dirs(rng, floaters) * rng.uniform(1.1, 1.4, (floaters, 1))
+        extra_v.append((centers[:, None, :] + tet).reshape(-1, 3))
+        extra_f.append((tet_f + base + 4 * np.arange(floaters)[:, None, None]).reshape(-1, 3))
+
+    return trimesh.Trimesh(np.vstack(extra_v), np.vstack(extra_f), process=False)
+
+
+def split_seams(mesh: trimesh.Trimesh, blocks: int = 16, jitter: float = 1e-7,
+                seed: int = 0) -> trimesh.Trimesh:
+    """
+    Duplicate vertices along the walls of a blocks³ grid.
+
+    Each face is assigned to the grid block holding its centroid; vertices
+    used by several blocks get one copy per block, offset by up to jitter ×
+    bbox diagonal. The surface is geometrically unchanged but every block
+    wall becomes a ring of boundary edges — what welding should undo.
+    """
+    rng = np.random.default_rng(seed)
+    vertices, faces = np.asarray(mesh.vertices), np.asarray(mesh.faces)
+    lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+
+    cell = np.floor((vertices[faces].mean(axis=1) - lo) / (hi - lo + 1e-12) * blocks)
+    block = (cell[:, 0] * blocks + cell[:, 1]) * blocks + cell[:, 2]
+    pairs = np.stack([faces, np.repeat(block[:, None], 3, axis=1)], -1).reshape(-1, 2)
+    uniq, inverse = np.unique(pairs.astype(np.int64), axis=0, return_inverse=True)
+
+    diag = float(np.linalg.norm(hi - lo))
+    copies = vertices[uniq[:, 0]] + rng.uniform(-1, 1, (len(uniq), 3)) * jitter * diag
+    return trimesh.Trimesh(copies, inverse.reshape(-1, 3), process=False)
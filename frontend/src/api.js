@@ -23,14 +23,26 @@ export function getStlUrl(jobId) {
   return `${BASE}/api/job/${jobId}/stl`;
 }
 
-export function getGlbUrl(jobId) {
-  return `${BASE}/api/job/${jobId}/glb`;
+export function getGlbUrl(jobId, { full = false } = {}) {
+  return `${BASE}/api/job/${jobId}/glb${full ? '?full=1' : ''}`;
 }
 
 export function getThumbnailUrl(jobId) {
   return `${BASE}/api/job/${jobId}/thumbnail`;
 }
 
+export function getPreviewUrl(jobId) {
+  return `${BASE}/api/job/${jobId}/preview`;
+}
+
+export function getTurntableUrl(jobId) {
+  return `${BASE}/api/job/${jobId}/turntable`;
+}
+
+export function getPreviewMeshUrl(jobId) {
+  return `${BASE}/api/job/${jobId}/preview_mesh`;
+}
+
 export async function getQueueStatus() {
   const res = await fetch(`${BASE}/api/queue`);
   if (!res.ok) throw new Error('Failed to fetch queue');
@@ -80,6 +92,10 @@ export function makeWsUrl(jobId) {
   return `${proto}://${window.location.host}/ws/job/${jobId}`;
 }
 
+export function makeEventsUrl(jobId) {
+  return `${BASE}/api/job/${jobId}/events`;
+}
+
 // ─── Admin API ──────────────────────────────────────────────
 
 function getAdminToken() {
@@ -1,18 +1,27 @@
 import { useState } from 'react';
-import { getThumbnailUrl } from '../api';
+import { getPreviewUrl, getThumbnailUrl, getTurntableUrl } from '../api';
 import ReportModal from './ReportModal';
 
 export default function GalleryCard({ item, onClick }) {
   const [showReport, setShowReport] = useState(false);
+  const [hovered, setHovered] = useState(false);
 
   return (
     <>
       <div
         className="glass rounded-xl overflow-hidden cursor-pointer hover:border-[var(--color-accent)]/20 transition-all group"
         onClick={onClick}
+        onMouseEnter={() => setHovered(true)}
+        onMouseLeave={() => setHovered(false)}
       >
         <div className="aspect-square bg-[var(--color-surface-2)] flex items-center justify-center overflow-hidden">
-          {item.thumbnail_url ? (
+          {item.preview_url ? (
+            <img
+              src={hovered && item.turntable_url ? getTurntableUrl(item.job_id) : getPreviewUrl(item.job_id)}
+              alt="Model preview"
+              className="w-full h-full object-contain"
+            />
+          ) : item.thumbnail_url ? (
             <img
               src={getThumbnailUrl(item.job_id)}
               alt="Model thumbnail"
@@ -1,4 +1,4 @@
-export default function ModelViewer({ glbUrl }) {
+export default function ModelViewer({ glbUrl, label = 'Interactive 3D Viewer' }) {
   return (
     <div className="glass-strong rounded-2xl overflow-hidden glow-accent-sm relative">
       <model-viewer
@@ -19,7 +19,7 @@ export default function ModelViewer({ glbUrl }) {
           Loading 3D model...
         </div>
       </model-viewer>
-      <div className="absolute top-4 left-4 text-xs font-mono text-[var(--color-muted-2)]">Interactive 3D Viewer</div>
+      <div className="absolute top-4 left-4 text-xs font-mono text-[var(--color-muted-2)]">{label}</div>
     </div>
   );
 }
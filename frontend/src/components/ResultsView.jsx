@@ -67,9 +67,9 @@ export default function ResultsView({ job }) {
             </svg>
             Download STL
           </a>
-          {job.glb_url && (
+          {job.glb_full_url && (
             <a
-              href={getGlbUrl(job.job_id)}
+              href={getGlbUrl(job.job_id, { full: true })}
               download
               className="flex-1 py-3.5 glass-strong text-sm font-medium rounded-xl hover:bg-[var(--color-surface-3)] flex items-center justify-center gap-2 text-[var(--color-muted)] hover:text-white transition-colors"
             >
@@ -1,21 +1,21 @@
 import { useEffect, useRef, useState, useCallback } from 'react';
-import { makeWsUrl } from '../api';
+import { makeEventsUrl, makeWsUrl } from '../api';
 
 export default function useJobWebSocket(jobId) {
   const [progress, setProgress] = useState(null);
   const [result, setResult] = useState(null);
+  const [preview, setPreview] = useState(null);
   const [error, setError] = useState(null);
   const wsRef = useRef(null);
 
   const connect = useCallback(() => {
     if (!jobId) return;
 
-    const ws = new WebSocket(makeWsUrl(jobId));
-    wsRef.current = ws;
-
-    ws.onmessage = (event) => {
-      const msg = JSON.parse(event.data);
+    let events = null;
+    let gotMessage = false;
 
+    // Returns true once the job has finished and the stream can close
+    const handle = (msg) => {
       if (msg.type === 'status' || msg.type === 'progress') {
         setProgress({
           step: msg.step,
@@ -23,17 +23,42 @@ export default function useJobWebSocket(jobId) {
           message: msg.message,
           status: msg.status,
         });
+        return msg.status === 'expired';
+      } else if (msg.type === 'preview') {
+        setPreview({ glbUrl: msg.glb_url, faceCount: msg.face_count });
       } else if (msg.type === 'complete') {
         setResult(msg);
-        ws.close();
+        return true;
       } else if (msg.type === 'failed') {
         setError({ message: msg.error, step: msg.step });
-        ws.close();
+        return true;
       }
+      return false;
+    };
+
+    // Server-Sent Events fallback for proxies that drop WebSockets;
+    // EventSource reconnects on its own and resumes via Last-Event-ID
+    const openEvents = () => {
+      events = new EventSource(makeEventsUrl(jobId));
+      events.onmessage = (event) => {
+        if (handle(JSON.parse(event.data))) events.close();
+      };
+    };
+
+    const ws = new WebSocket(makeWsUrl(jobId));
+    wsRef.current = ws;
+
+    ws.onmessage = (event) => {
+      gotMessage = true;
+      if (handle(JSON.parse(event.data))) ws.close();
     };
 
     ws.onerror = () => {
-      setError({ message: 'WebSocket connection error' });
+      if (!gotMessage) {
+        openEvents();
+      } else {
+        setError({ message: 'WebSocket connection error' });
+      }
     };
 
     // Send keepalive pings every 25s
@@ -50,6 +75,7 @@ export default function useJobWebSocket(jobId) {
     return () => {
       clearInterval(pingInterval);
       ws.close();
+      if (events) events.close();
     };
   }, [jobId]);
 
@@ -58,5 +84,5 @@ export default function useJobWebSocket(jobId) {
     return cleanup;
   }, [connect]);
 
-  return { progress, result, error };
+  return { progress, preview, result, error };
 }
@@ -3,12 +3,13 @@ import { useParams, Link } from 'react-router-dom';
 import useJobWebSocket from '../hooks/useJobWebSocket';
 import ProgressView from '../components/ProgressView';
 import ResultsView from '../components/ResultsView';
+import ModelViewer from '../components/ModelViewer';
 import { useToast } from '../components/Toast';
-import { getJob } from '../api';
+import { getJob, getPreviewMeshUrl } from '../api';
 
 export default function JobPage() {
   const { jobId } = useParams();
-  const { progress, result, error: wsError } = useJobWebSocket(jobId);
+  const { progress, preview, result, error: wsError } = useJobWebSocket(jobId);
   const [job, setJob] = useState(null);
   const [pollError, setPollError] = useState(null);
   const toast = useToast();
@@ -90,7 +91,12 @@ export default function JobPage() {
           </Link>
         </div>
       ) : (
-        <ProgressView step={currentStep} pct={currentPct} message={currentMessage} queuePosition={queuePosition} />
+        <div className="space-y-6">
+          {preview && (
+            <ModelViewer glbUrl={getPreviewMeshUrl(jobId)} label="Rough preview — refining..." />
+          )}
+          <ProgressView step={currentStep} pct={currentPct} message={currentMessage} queuePosition={queuePosition} />
+        </div>
       )}
     </div>
   );
@@ -32,6 +32,9 @@ class Settings(BaseSettings):
     output_dir: str = "outputs"
     max_upload_bytes: int = 20 * 1024 * 1024  # 20 MB
     allowed_extensions: list[str] = ["jpg", "jpeg", "png", "webp"]
+    upload_max_side: int = 1024  # longest side stored and sent to the worker; 0 = as uploaded
+    keep_original_upload: bool = False  # also store the full-size (upright, EXIF-stripped) upload
+    signed_url_ttl_s: int = 300  # lifetime of the input-image URL handed to the worker
 
     # Rate limiting
     rate_limit_per_day: int = 20
@@ -39,7 +42,20 @@ class Settings(BaseSettings):
 
     # Job settings
     job_timeout_s: int = 600  # 10 minutes
+    worker_resume_grace_s: int = 120  # wait for a dropped worker to reconnect before re-queueing
     cleanup_interval_s: int = 120
+    dispatch_sweep_interval_s: int = 30  # fallback poll; dispatch is event-driven
+    queue_hint_interval_s: int = 10  # how often the worker hears the pending count
+    queue_hint_window_s: int = 1800  # upload history used to predict the next arrival
+    progress_flush_interval_s: float = 2.0  # live progress hits the DB at most this often per step
+    subscriber_queue_size: int = 32  # per-client outbox; oldest progress updates dropped when full
+    event_log_size: int = 64  # per-job SSE replay buffer (events)
+    event_log_ttl_s: int = 300  # keep a finished job's buffer this long for reconnects
+    event_log_max_jobs: int = 1000  # buffers kept in memory; oldest evicted first
+    sse_keepalive_s: int = 15  # comment line sent on an idle event stream
+    job_cache_size: int = 2000  # GET /api/job snapshots kept in memory (LRU)
+    job_cache_ttl_s: int = 300  # snapshot lifetime; bounds staleness from other processes
+    job_cache_pending_ttl_s: int = 5  # pending snapshots carry a queue_position that drifts
 
     # Default generation settings
     default_steps: int = 50
@@ -47,6 +63,13 @@ class Settings(BaseSettings):
     default_octree_res: int = 384
     default_seed: int = 42
     default_height_mm: float = 100.0
+    default_target_faces: int = 0  # face budget after post-processing; 0 = no decimation
+
+    # Result cache — identical image + settings reuse a finished job's STL/GLB
+    result_cache_enabled: bool = True
+
+    # Preview renders — CPU still + turntable WebP for each completed job
+    preview_render_enabled: bool = True
 
     # Server
     cors_origins: list[str] = ["http://localhost:3000"]
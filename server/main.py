@@ -20,7 +20,7 @@ logging.basicConfig(
 logger = logging.getLogger("server")
 
 
-async def _cleanup_loop():
+async def _cleanup_loop(bridge: WorkerBridge):
     """Periodically expire stale jobs."""
     while True:
         try:
@@ -29,6 +29,8 @@ async def _cleanup_loop():
                 expired = await queue_service.expire_stale_jobs(session)
                 if expired:
                     logger.info("Expired %d stale jobs: %s", len(expired), expired)
+                for job_id in expired:
+                    bridge.job_closed(job_id, "Job timed out")
         except asyncio.CancelledError:
             break
         except Exception:
@@ -46,27 +48,15 @@ async def lifespan(app: FastAPI):
 
     # Reset orphaned jobs (assigned/processing at shutdown) back to pending
     async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
-        from sqlalchemy import select
-        from models.job import Job, JobStatus
-        result = await session.execute(
-            select(Job).where(Job.status.in_([JobStatus.assigned, JobStatus.processing]))
-        )
-        orphaned = result.scalars().all()
-        for job in orphaned:
-            job.status = JobStatus.pending
-            job.assigned_at = None
-            job.current_step = None
-            job.progress_pct = 0
-            job.progress_message = None
+        orphaned = await queue_service.requeue_jobs(session)
         if orphaned:
-            await session.commit()
             logger.info("Re-queued %d orphaned jobs on startup", len(orphaned))
 
     # Singletons
     app.state.worker_bridge = WorkerBridge()
 
     # Background tasks
-    cleanup_task = asyncio.create_task(_cleanup_loop())
+    cleanup_task = asyncio.create_task(_cleanup_loop(app.state.worker_bridge))
     logger.info("Server started")
 
     yield
@@ -113,5 +103,6 @@ async def health():
     return {
         "status": "ok",
         "worker_connected": bridge.worker_connected,
+        "workers": len(bridge.workers),
         "paused": bridge.paused,
     }
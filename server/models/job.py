@@ -28,10 +28,16 @@ class Job(SQLModel, table=True):
 
     # Upload info
     original_filename: str
-    upload_path: str  # relative to UPLOAD_DIR
+    upload_path: str  # relative to UPLOAD_DIR; normalized, sent to the worker
+    original_path: Optional[str] = None  # full-size upload, if keep_original_upload
     thumbnail_path: Optional[str] = None
     image_hash: str  # SHA-256
 
+    # Result cache: hash of (image_hash, normalized settings); cached_from is
+    # the job whose artifacts this one links to instead of owning its own
+    cache_key: Optional[str] = Field(default=None, index=True)
+    cached_from: Optional[str] = None
+
     # Client info
     client_ip: str
     user_agent: Optional[str] = None
@@ -47,14 +53,24 @@ class Job(SQLModel, table=True):
     # Results
     stl_path: Optional[str] = None  # relative to OUTPUT_DIR
     glb_path: Optional[str] = None
+    web_glb_path: Optional[str] = None  # compact viewer GLB (decimated, quantized)
+    preview_path: Optional[str] = None  # server-rendered WebP still
+    turntable_path: Optional[str] = None  # server-rendered animated WebP
     vertex_count: Optional[int] = None
     face_count: Optional[int] = None
     is_watertight: Optional[bool] = None
     generation_time_s: Optional[float] = None
 
+    # Final mesh stats from worker: extents, volume, area, edge counts,
+    # components, euler_number (see img2stl.mesh_stats)
+    mesh_stats: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+
     # GPU metrics from worker
     gpu_metrics: Optional[dict] = Field(default=None, sa_column=Column(JSON))
 
+    # Per-stage timing spans from worker: [{stage, start_s, duration_s}, ...]
+    spans: Optional[list] = Field(default=None, sa_column=Column(JSON))
+
     # Error info
     error_message: Optional[str] = Field(default=None, sa_column=Column(Text))
     error_step: Optional[str] = None
@@ -44,20 +44,29 @@ async def admin_login(body: LoginRequest):
 
 # ─── Worker status & GPU ──────────────────────────────────────
 
+def _first_worker(bridge: WorkerBridge):
+    """The single-worker view older clients (tray, /gpu) still read."""
+    return next(iter(bridge.workers.values()), None)
+
+
 @router.get("/worker/status", dependencies=[Depends(_verify_admin)])
 async def worker_status(request: Request):
     bridge = _get_bridge(request)
+    first = _first_worker(bridge)
     return {
         "connected": bridge.worker_connected,
-        "info": bridge.worker_info,
         "paused": bridge.paused,
+        "info": first.info if first else {},
+        "model_tier_history": list(first.model_tier_history) if first else [],
+        "workers": [w.to_dict() for w in bridge.workers.values()],
     }
 
 
 @router.get("/gpu", dependencies=[Depends(_verify_admin)])
 async def gpu_status(request: Request):
-    bridge = _get_bridge(request)
-    return bridge.gpu_status or {}
+    """GPU status of the first connected worker (see /workers for all of them)."""
+    worker = _first_worker(_get_bridge(request))
+    return worker.gpu_status if worker else {}
 
 
 @router.post("/worker/pause", dependencies=[Depends(_verify_admin)])
@@ -73,9 +82,50 @@ async def resume_worker(request: Request):
     bridge = _get_bridge(request)
     bridge.paused = False
     await bridge.send_command("resume")
+    bridge.notify_dispatch()
     return {"status": "resumed"}
 
 
+@router.get("/workers", dependencies=[Depends(_verify_admin)])
+async def list_workers(request: Request):
+    bridge = _get_bridge(request)
+    return [w.to_dict() for w in bridge.workers.values()]
+
+
+def _require_worker(request: Request, worker_id: str):
+    worker = _get_bridge(request).get_worker(worker_id)
+    if not worker:
+        raise HTTPException(404, "Worker not connected")
+    return worker
+
+
+@router.post("/workers/{worker_id}/pause", dependencies=[Depends(_verify_admin)])
+async def pause_one_worker(request: Request, worker_id: str):
+    worker = _require_worker(request, worker_id)
+    worker.paused = True
+    await _get_bridge(request).send_command("pause", worker_id=worker_id)
+    return worker.to_dict()
+
+
+@router.post("/workers/{worker_id}/resume", dependencies=[Depends(_verify_admin)])
+async def resume_one_worker(request: Request, worker_id: str):
+    """Undo pause and drain."""
+    worker = _require_worker(request, worker_id)
+    worker.paused = worker.draining = False
+    bridge = _get_bridge(request)
+    await bridge.send_command("resume", worker_id=worker_id)
+    bridge.notify_dispatch()
+    return worker.to_dict()
+
+
+@router.post("/workers/{worker_id}/drain", dependencies=[Depends(_verify_admin)])
+async def drain_worker(request: Request, worker_id: str):
+    """Stop sending new jobs; in-flight ones finish. 'drained' turns true when done."""
+    worker = _require_worker(request, worker_id)
+    worker.draining = True
+    return worker.to_dict()
+
+
 @router.post("/force/{job_id}", dependencies=[Depends(_verify_admin)])
 async def force_process(request: Request, job_id: str):
     bridge = _get_bridge(request)
@@ -104,12 +154,15 @@ async def dashboard(
     total_complete = row[0]
     avg_time = round(row[1], 1) if row[1] else None
 
+    first = _first_worker(bridge)
     return {
         "worker": {
             "connected": bridge.worker_connected,
-            "info": bridge.worker_info,
-            "gpu_status": bridge.gpu_status,
             "paused": bridge.paused,
+            # First worker's details, for single-worker clients like the tray
+            "info": first.info if first else {},
+            "gpu_status": first.gpu_status if first else {},
+            "workers": [w.to_dict() for w in bridge.workers.values()],
         },
         "queue": summary,
         "stats": {
@@ -161,6 +214,7 @@ async def list_jobs(
                 "vertex_count": j.vertex_count,
                 "face_count": j.face_count,
                 "is_watertight": j.is_watertight,
+                "mesh_stats": j.mesh_stats,
                 "generation_time_s": j.generation_time_s,
                 "gpu_metrics": j.gpu_metrics,
                 "error_message": j.error_message,
@@ -191,8 +245,11 @@ async def get_job_detail(job_id: str, session: AsyncSession = Depends(get_sessio
         "vertex_count": job.vertex_count,
         "face_count": job.face_count,
         "is_watertight": job.is_watertight,
+        "mesh_stats": job.mesh_stats,
         "generation_time_s": job.generation_time_s,
         "gpu_metrics": job.gpu_metrics,
+        "spans": job.spans,
+        "cached_from": job.cached_from,
         "error_message": job.error_message,
         "error_step": job.error_step,
         "feedback_rating": job.feedback_rating,
@@ -204,7 +261,9 @@ async def get_job_detail(job_id: str, session: AsyncSession = Depends(get_sessio
 
 
 @router.post("/jobs/{job_id}/cancel", dependencies=[Depends(_verify_admin)])
-async def cancel_job(job_id: str, session: AsyncSession = Depends(get_session)):
+async def cancel_job(
+    request: Request, job_id: str, session: AsyncSession = Depends(get_session)
+):
     result = await session.execute(select(Job).where(Job.id == job_id))
     job = result.scalar_one_or_none()
     if not job:
@@ -215,11 +274,14 @@ async def cancel_job(job_id: str, session: AsyncSession = Depends(get_session)):
     job.error_message = "Cancelled by admin"
     job.completed_at = datetime.utcnow()
     await session.commit()
+    _get_bridge(request).job_closed(job_id, job.error_message)
     return {"status": "cancelled"}
 
 
 @router.post("/jobs/{job_id}/retry", dependencies=[Depends(_verify_admin)])
-async def retry_job(job_id: str, session: AsyncSession = Depends(get_session)):
+async def retry_job(
+    request: Request, job_id: str, session: AsyncSession = Depends(get_session)
+):
     result = await session.execute(select(Job).where(Job.id == job_id))
     job = result.scalar_one_or_none()
     if not job:
@@ -231,18 +293,27 @@ async def retry_job(job_id: str, session: AsyncSession = Depends(get_session)):
     job.completed_at = None
     job.progress_pct = 0
     job.current_step = None
+    await queue.notify_pending(session)
     await session.commit()
+    bridge = _get_bridge(request)
+    bridge.snapshots.invalidate(job_id)
+    bridge.snapshots.invalidate_pending()
+    bridge.notify_dispatch()
     return {"status": "retrying"}
 
 
 @router.delete("/jobs/{job_id}", dependencies=[Depends(_verify_admin)])
-async def delete_job(job_id: str, session: AsyncSession = Depends(get_session)):
+async def delete_job(
+    request: Request, job_id: str, session: AsyncSession = Depends(get_session)
+):
     result = await session.execute(select(Job).where(Job.id == job_id))
     job = result.scalar_one_or_none()
     if not job:
         raise HTTPException(404, "Job not found")
+    await queue.release_job_files(session, job)
     await session.delete(job)
     await session.commit()
+    _get_bridge(request).snapshots.invalidate(job_id)
     return {"deleted": True}
 
 
@@ -314,6 +385,7 @@ async def get_settings():
         "default_octree_res": settings.default_octree_res,
         "default_seed": settings.default_seed,
         "default_height_mm": settings.default_height_mm,
+        "default_target_faces": settings.default_target_faces,
     }
 
 
@@ -323,7 +395,7 @@ async def update_settings(body: dict):
     allowed = {
         "rate_limit_per_day", "max_pending_jobs", "job_timeout_s",
         "default_steps", "default_guidance", "default_octree_res",
-        "default_seed", "default_height_mm",
+        "default_seed", "default_height_mm", "default_target_faces",
     }
     updated = {}
     for key, value in body.items():
@@ -415,3 +487,58 @@ async def stats(session: AsyncSession = Depends(get_session)):
         "total_failed": failed,
         "failure_rate": round(failed / total, 3) if total else 0,
     }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Linear-interpolated percentile of a sorted list (q in 0..100)."""
+    pos = (len(values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+@router.get("/stats/stages", dependencies=[Depends(_verify_admin)])
+async def stage_stats(
+    hours: float = Query(24, gt=0, le=24 * 90),
+    session: AsyncSession = Depends(get_session),
+):
+    """p50/p95/p99 seconds per pipeline stage for jobs completed in the window.
+
+    A stage that ran more than once in a job (e.g. diffusion after an OOM
+    retry) counts as its summed duration. "total" is generation_time_s.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+    result = await session.execute(
+        select(Job.spans, Job.generation_time_s).where(
+            Job.status == JobStatus.complete,
+            Job.completed_at >= cutoff,
+            Job.cached_from.is_(None),
+        )
+    )
+
+    durations: dict[str, list[float]] = {}
+    jobs = 0
+    for spans, total in result.all():
+        if not spans:
+            continue
+        jobs += 1
+        per_job: dict[str, float] = {}
+        for span in spans:
+            per_job[span["stage"]] = per_job.get(span["stage"], 0.0) + span["duration_s"]
+        if total is not None:
+            per_job["total"] = total
+        for stage, secs in per_job.items():
+            durations.setdefault(stage, []).append(secs)
+
+    stages = {}
+    for stage, values in durations.items():
+        values.sort()
+        stages[stage] = {
+            "count": len(values),
+            "mean": round(sum(values) / len(values), 3),
+            "p50": round(_percentile(values, 50), 3),
+            "p95": round(_percentile(values, 95), 3),
+            "p99": round(_percentile(values, 99), 3),
+        }
+
+    return {"window_hours": hours, "jobs": jobs, "stages": stages}
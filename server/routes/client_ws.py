@@ -1,12 +1,16 @@
 import asyncio
+import json
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlmodel.ext.asyncio.session import AsyncSession as SQLModelAsyncSession
 
+from config import settings
 from database import engine
 from models.job import Job, JobStatus
-from services.worker_bridge import WorkerBridge
+from services import storage
+from services.worker_bridge import TERMINAL_EVENTS, WorkerBridge
 
 router = APIRouter()
 
@@ -15,49 +19,74 @@ def _get_bridge(ws: WebSocket) -> WorkerBridge:
     return ws.app.state.worker_bridge
 
 
+async def _load_job(job_id: str) -> Job | None:
+    async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
+        result = await session.execute(select(Job).where(Job.id == job_id))
+        return result.scalar_one_or_none()
+
+
+def _snapshot(job: Job, bridge: WorkerBridge) -> list[dict]:
+    """Messages that bring a new client up to date with job."""
+    # Live progress is ahead of the debounced DB copy
+    progress = bridge.live_progress(job.id) or {
+        "step": job.current_step,
+        "progress_pct": job.progress_pct,
+        "message": job.progress_message,
+    }
+    messages = [{
+        "type": "status",
+        "job_id": job.id,
+        "status": job.status.value,
+        **progress,
+    }]
+
+    if job.status == JobStatus.complete:
+        messages.append({
+            "type": "complete",
+            "job_id": job.id,
+            "vertex_count": job.vertex_count,
+            "face_count": job.face_count,
+            "is_watertight": job.is_watertight,
+            "mesh_stats": job.mesh_stats,
+            "generation_time_s": job.generation_time_s,
+        })
+    elif job.status in (JobStatus.failed, JobStatus.expired):
+        # Expired is terminal too; clients close on "failed" (same as a live timeout)
+        messages.append({
+            "type": "failed",
+            "job_id": job.id,
+            "error": job.error_message,
+            "step": job.error_step,
+        })
+    elif storage.get_output_path(storage.preview_mesh_rel(job.id)).exists():
+        # Coarse preview already arrived before this client connected
+        messages.append({
+            "type": "preview",
+            "job_id": job.id,
+            "glb_url": f"/api/job/{job.id}/preview_mesh",
+        })
+    return messages
+
+
+def _is_finished(job: Job) -> bool:
+    return job.status in (JobStatus.complete, JobStatus.failed, JobStatus.expired)
+
+
 @router.websocket("/ws/job/{job_id}")
 async def job_progress_websocket(ws: WebSocket, job_id: str):
     await ws.accept()
     bridge = _get_bridge(ws)
 
-    # Send current state immediately
-    async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
-        result = await session.execute(select(Job).where(Job.id == job_id))
-        job = result.scalar_one_or_none()
-
+    job = await _load_job(job_id)
     if not job:
         await ws.send_json({"type": "error", "message": "Job not found"})
         await ws.close()
         return
 
-    # Send current status snapshot
-    await ws.send_json({
-        "type": "status",
-        "job_id": job.id,
-        "status": job.status.value,
-        "step": job.current_step,
-        "progress_pct": job.progress_pct,
-        "message": job.progress_message,
-    })
-
-    # If job is already terminal, close
-    if job.status in (JobStatus.complete, JobStatus.failed, JobStatus.expired):
-        if job.status == JobStatus.complete:
-            await ws.send_json({
-                "type": "complete",
-                "job_id": job.id,
-                "vertex_count": job.vertex_count,
-                "face_count": job.face_count,
-                "is_watertight": job.is_watertight,
-                "generation_time_s": job.generation_time_s,
-            })
-        elif job.status == JobStatus.failed:
-            await ws.send_json({
-                "type": "failed",
-                "job_id": job.id,
-                "error": job.error_message,
-                "step": job.error_step,
-            })
+    # Send current state immediately; if job is already terminal, close
+    for message in _snapshot(job, bridge):
+        await ws.send_json(message)
+    if _is_finished(job):
         await ws.close()
         return
 
@@ -71,3 +100,68 @@ async def job_progress_websocket(ws: WebSocket, job_id: str):
         pass
     finally:
         bridge.unsubscribe(job_id, ws)
+
+
+def _sse(message: dict, event_id: int | None = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}data: {json.dumps(message)}\n\n"
+
+
+@router.get("/api/job/{job_id}/events")
+async def job_progress_events(
+    request: Request, job_id: str, last_event_id: str | None = Header(None)
+):
+    """
+    Server-Sent Events twin of /ws/job/{job_id}, for clients whose proxies
+    drop WebSockets.
+
+    Events carry per-job ids. A reconnect with Last-Event-ID replays what it
+    missed from the bridge's ring buffer, so no DB query is needed while
+    the job is active. Jobs without a buffer (pending, or long finished)
+    start from a DB snapshot, like the WebSocket does.
+    """
+    bridge: WorkerBridge = request.app.state.worker_bridge
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+
+    initial: list[dict] = []
+    opened = bridge.open_stream(job_id, last_id)
+    if opened is None:
+        job = await _load_job(job_id)
+        if not job:
+            raise HTTPException(404, "Job not found")
+        initial = _snapshot(job, bridge)
+        if not _is_finished(job):
+            opened = bridge.open_stream(job_id, None, create=True)
+
+    async def stream():
+        yield "retry: 3000\n\n"
+        for message in initial:
+            yield _sse(message)
+        if opened is None:
+            return
+        replay, sub = opened
+        try:
+            for event_id, message in replay:
+                yield _sse(message, event_id)
+                if message["type"] in TERMINAL_EVENTS:
+                    return
+            while True:
+                try:
+                    event_id, message = await asyncio.wait_for(
+                        sub.get(), settings.sse_keepalive_s)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(message, event_id)
+                if message["type"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            bridge.unsubscribe(job_id, sub)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # nginx: flush each event
+    })
@@ -26,7 +26,10 @@ async def gallery(
         {
             "job_id": j.id,
             "thumbnail_url": f"/api/job/{j.id}/thumbnail" if j.thumbnail_path else None,
+            "preview_url": f"/api/job/{j.id}/preview" if j.preview_path else None,
+            "turntable_url": f"/api/job/{j.id}/turntable" if j.turntable_path else None,
             "vertex_count": j.vertex_count,
+            "mesh_stats": j.mesh_stats,
             "generation_time_s": j.generation_time_s,
             "completed_at": j.completed_at.isoformat() if j.completed_at else None,
         }
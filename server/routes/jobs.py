@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, UploadFile, File
+from fastapi.responses import FileResponse, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -39,11 +39,6 @@ async def upload_image(
     if not allowed:
         raise HTTPException(429, f"Rate limit exceeded. Try again in 24 hours.")
 
-    # Check queue capacity
-    pending = await queue.pending_count(session)
-    if pending >= settings.max_pending_jobs:
-        raise HTTPException(503, "Queue is full. Please try again later.")
-
     # Read file data
     data = await file.read()
     if not data:
@@ -51,33 +46,56 @@ async def upload_image(
 
     # Validate image
     try:
-        cleaned, sha256, ext = image_validator.validate_and_process(
+        cleaned, sha256, ext, original = image_validator.validate_and_process(
             data, file.filename or "upload"
         )
     except image_validator.ImageValidationError as e:
         raise HTTPException(400, str(e))
 
+    job_settings = {
+        "steps": settings.default_steps,
+        "guidance": settings.default_guidance,
+        "octree_res": settings.default_octree_res,
+        "seed": settings.default_seed,
+        "height_mm": settings.default_height_mm,
+        "target_faces": settings.default_target_faces,
+    }
+    cache_key = queue.compute_cache_key(sha256, job_settings)
+
+    # Identical image + settings already generated? Link to that result.
+    cached = None
+    if settings.result_cache_enabled:
+        cached = await queue.find_cached_result(session, cache_key)
+
+    # Check queue capacity (cache hits never reach the queue)
+    pending = 0
+    if not cached:
+        pending = await queue.pending_count(session)
+        if pending >= settings.max_pending_jobs:
+            raise HTTPException(503, "Queue is full. Please try again later.")
+
     # Create job record first to get ID
     job = Job(
         original_filename=file.filename or "upload",
         upload_path="",  # filled below
         image_hash=sha256,
+        cache_key=cache_key,
         client_ip=ip,
         user_agent=request.headers.get("user-agent"),
-        settings={
-            "steps": settings.default_steps,
-            "guidance": settings.default_guidance,
-            "octree_res": settings.default_octree_res,
-            "seed": settings.default_seed,
-            "height_mm": settings.default_height_mm,
-        },
+        settings=job_settings,
     )
+    if cached:
+        queue.link_cached_result(job, cached)
     job = await queue.enqueue(session, job)
 
     # Save file with job ID in path
     upload_rel = f"{job.id}/input.{ext}"
     storage.save_upload(cleaned, upload_rel)
     job.upload_path = upload_rel
+    if original is not None:
+        original_rel = f"{job.id}/original.{ext}"
+        storage.save_upload(original, original_rel)
+        job.original_path = original_rel
 
     # Generate thumbnail
     thumb_rel = f"{job.id}/thumb.jpg"
@@ -88,37 +106,77 @@ async def upload_image(
     except Exception:
         pass  # Non-critical
 
+    # Only now is the job dispatchable (upload saved) — wake the dispatchers
+    if not cached:
+        await queue.notify_pending(session)
     await session.commit()
     await session.refresh(job)
+    if cached:
+        request.app.state.worker_bridge.ensure_previews(job)
+    else:
+        request.app.state.worker_bridge.notify_dispatch()
 
     # Audit log
-    session.add(AuditLog(action="upload", client_ip=ip, job_id=job.id))
+    session.add(AuditLog(
+        action="upload", client_ip=ip, job_id=job.id,
+        detail=f"cache_hit={job.cached_from}" if cached else None,
+    ))
     await session.commit()
     rate_limiter.invalidate_cache(ip)
 
     return {
         "job_id": job.id,
         "status": job.status.value,
-        "queue_position": pending + 1,
+        "queue_position": 0 if cached else pending + 1,
         "remaining_uploads": remaining - 1,
+        "cached": bool(cached),
     }
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
 @router.get("/job/{job_id}")
-async def get_job(job_id: str, session: AsyncSession = Depends(get_session)):
+async def get_job(
+    job_id: str,
+    request: Request,
+    if_none_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_session),
+):
+    # Served from the bridge's snapshot cache when possible: no DB round
+    # trip, no serialization, and a 304 if the client's copy is current
+    bridge = request.app.state.worker_bridge
+    cached = bridge.snapshots.get(job_id)
+    if cached is None:
+        epoch = bridge.snapshots.epoch
+        resp = await _build_job_snapshot(job_id, bridge, session)
+        cached = bridge.snapshots.put(job_id, resp, epoch)
+    body, etag = cached
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def _build_job_snapshot(job_id: str, bridge, session: AsyncSession) -> dict:
     result = await session.execute(select(Job).where(Job.id == job_id))
     job = result.scalar_one_or_none()
     if not job:
         raise HTTPException(404, "Job not found")
 
+    live = bridge.live_progress(job.id)
+
     resp = {
         "job_id": job.id,
         "status": job.status.value,
         "original_filename": job.original_filename,
         "settings": job.settings,
-        "current_step": job.current_step,
-        "progress_pct": job.progress_pct,
-        "progress_message": job.progress_message,
+        "current_step": live["step"] if live else job.current_step,
+        "progress_pct": live["progress_pct"] if live else job.progress_pct,
+        "progress_message": live["message"] if live else job.progress_message,
         "created_at": job.created_at.isoformat(),
     }
 
@@ -137,11 +195,15 @@ async def get_job(job_id: str, session: AsyncSession = Depends(get_session)):
             "vertex_count": job.vertex_count,
             "face_count": job.face_count,
             "is_watertight": job.is_watertight,
+            "mesh_stats": job.mesh_stats,
             "generation_time_s": job.generation_time_s,
             "gpu_metrics": job.gpu_metrics,
             "completed_at": job.completed_at.isoformat() if job.completed_at else None,
             "stl_url": f"/api/job/{job.id}/stl",
-            "glb_url": f"/api/job/{job.id}/glb" if job.glb_path else None,
+            "glb_url": f"/api/job/{job.id}/glb" if job.glb_path or job.web_glb_path else None,
+            "glb_full_url": f"/api/job/{job.id}/glb?full=1" if job.glb_path else None,
+            "preview_url": f"/api/job/{job.id}/preview" if job.preview_path else None,
+            "turntable_url": f"/api/job/{job.id}/turntable" if job.turntable_path else None,
         })
     elif job.status == JobStatus.failed:
         resp.update({
@@ -168,6 +230,53 @@ async def get_thumbnail(job_id: str, session: AsyncSession = Depends(get_session
     return FileResponse(path, media_type="image/jpeg")
 
 
+@router.get("/job/{job_id}/preview")
+async def get_preview(job_id: str, session: AsyncSession = Depends(get_session)):
+    result = await session.execute(select(Job).where(Job.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(404, "Job not found")
+    if not job.preview_path:
+        raise HTTPException(404, "Preview not available")
+
+    path = storage.get_output_path(job.preview_path)
+    if not path.exists():
+        raise HTTPException(404, "Preview file missing")
+
+    return FileResponse(path, media_type="image/webp")
+
+
+@router.get("/job/{job_id}/turntable")
+async def get_turntable(job_id: str, session: AsyncSession = Depends(get_session)):
+    result = await session.execute(select(Job).where(Job.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(404, "Job not found")
+    if not job.turntable_path:
+        raise HTTPException(404, "Turntable not available")
+
+    path = storage.get_output_path(job.turntable_path)
+    if not path.exists():
+        raise HTTPException(404, "Turntable file missing")
+
+    return FileResponse(path, media_type="image/webp")
+
+
+@router.get("/job/{job_id}/preview_mesh")
+async def get_preview_mesh(job_id: str, session: AsyncSession = Depends(get_session)):
+    """Coarse GLB sent by the worker mid-generation; gone once the job finishes."""
+    result = await session.execute(select(Job).where(Job.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(404, "Job not found")
+
+    path = storage.get_output_path(storage.preview_mesh_rel(job.id))
+    if not path.exists():
+        raise HTTPException(404, "Preview mesh not available")
+
+    return FileResponse(path, media_type="model/gltf-binary")
+
+
 @router.get("/job/{job_id}/stl")
 async def download_stl(job_id: str, session: AsyncSession = Depends(get_session)):
     result = await session.execute(select(Job).where(Job.id == job_id))
@@ -189,15 +298,21 @@ async def download_stl(job_id: str, session: AsyncSession = Depends(get_session)
 
 
 @router.get("/job/{job_id}/glb")
-async def download_glb(job_id: str, session: AsyncSession = Depends(get_session)):
+async def download_glb(
+    job_id: str,
+    full: bool = False,
+    session: AsyncSession = Depends(get_session),
+):
+    """Compact viewer GLB by default; ?full=1 for the full-resolution mesh."""
     result = await session.execute(select(Job).where(Job.id == job_id))
     job = result.scalar_one_or_none()
     if not job:
         raise HTTPException(404, "Job not found")
-    if job.status != JobStatus.complete or not job.glb_path:
+    rel = job.glb_path if full else (job.web_glb_path or job.glb_path)
+    if job.status != JobStatus.complete or not rel:
         raise HTTPException(404, "GLB not available")
 
-    path = storage.get_output_path(job.glb_path)
+    path = storage.get_output_path(rel)
     if not path.exists():
         raise HTTPException(404, "GLB file missing")
 
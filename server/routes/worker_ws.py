@@ -1,9 +1,14 @@
 import hmac
 import logging
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from fastapi import APIRouter, Depends, Header, HTTPException, WebSocket, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
+from database import get_session
+from models.job import Job, JobStatus
+from services import signed_url, storage
 from services.worker_bridge import WorkerBridge
 
 logger = logging.getLogger("worker_ws")
@@ -14,12 +19,15 @@ def _get_bridge(ws: WebSocket) -> WorkerBridge:
     return ws.app.state.worker_bridge
 
 
+def _worker_authorized(authorization: str) -> bool:
+    return hmac.compare_digest(authorization, f"Bearer {settings.worker_auth_token}")
+
+
 @router.websocket("/ws/worker")
 async def worker_websocket(ws: WebSocket):
     # Check auth before accepting
     auth = ws.headers.get("authorization", "")
-    expected = f"Bearer {settings.worker_auth_token}"
-    if not hmac.compare_digest(auth, expected):
+    if not _worker_authorized(auth):
         logger.warning("Worker auth failed from %s", ws.client.host if ws.client else "unknown")
         await ws.close(code=status.WS_1008_POLICY_VIOLATION)
         return
@@ -27,3 +35,26 @@ async def worker_websocket(ws: WebSocket):
     await ws.accept()
     bridge = _get_bridge(ws)
     await bridge.handle_worker(ws)
+
+
+@router.get("/api/worker/input/{job_id}")
+async def worker_input(
+    job_id: str,
+    expires: int,
+    sig: str,
+    authorization: str = Header(""),
+    session: AsyncSession = Depends(get_session),
+):
+    """Input image for a dispatched job; needs the worker token and a live signed URL."""
+    if not _worker_authorized(authorization):
+        raise HTTPException(401, "Unauthorized")
+    if not signed_url.verify(f"/api/worker/input/{job_id}", expires, sig):
+        raise HTTPException(403, "Invalid or expired signature")
+
+    job = await session.get(Job, job_id)
+    if not job or job.status not in (JobStatus.assigned, JobStatus.processing):
+        raise HTTPException(404, "Job not found")
+    path = storage.get_upload_path(job.upload_path)
+    if not path.exists():
+        raise HTTPException(404, "Upload file missing")
+    return FileResponse(path, headers={"X-Content-SHA256": job.image_hash})
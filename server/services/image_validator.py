@@ -2,7 +2,7 @@ import hashlib
 import io
 from pathlib import Path
 
-from PIL import Image
+from PIL import Image, ImageOps
 
 from config import settings
 
@@ -30,10 +30,20 @@ def check_magic_bytes(data: bytes) -> str:
     raise ImageValidationError("Unsupported image format (bad magic bytes)")
 
 
-def validate_and_process(data: bytes, original_filename: str) -> tuple[bytes, str, str]:
-    """Validate image, strip EXIF, compute hash.
+def validate_and_process(
+    data: bytes, original_filename: str
+) -> tuple[bytes, str, str, bytes | None]:
+    """Validate image, normalize size and orientation, strip EXIF, compute hash.
 
-    Returns (cleaned_bytes, sha256_hex, detected_extension).
+    The stored (and dispatched) image is capped at settings.upload_max_side
+    on its longest side. thumbnail() decodes JPEGs with draft() — libjpeg
+    scales by 1/2, 1/4 or 1/8 during the DCT — and shrinks the rest with
+    reduce() before the final resample, so a 6000 px photo is never fully
+    decoded. The hash is of the normalized bytes.
+
+    Returns (normalized_bytes, sha256_hex, detected_extension, original_bytes).
+    original_bytes is the full-size image, EXIF rotation applied and then
+    stripped, when settings.keep_original_upload is on, else None.
     """
     if len(data) > settings.max_upload_bytes:
         raise ImageValidationError(
@@ -51,8 +61,6 @@ def validate_and_process(data: bytes, original_filename: str) -> tuple[bytes, st
     except Exception as e:
         raise ImageValidationError(f"Invalid image data: {e}")
 
-    # Strip EXIF by re-saving without metadata
-    buf = io.BytesIO()
     # Convert to RGB if needed (e.g. RGBA png -> jpg)
     if img.mode in ("RGBA", "P"):
         save_fmt = "PNG"
@@ -60,11 +68,32 @@ def validate_and_process(data: bytes, original_filename: str) -> tuple[bytes, st
     else:
         save_fmt = "JPEG"
         save_ext = "jpg"
-    img.save(buf, format=save_fmt, quality=95)
-    cleaned = buf.getvalue()
 
-    sha256 = hashlib.sha256(cleaned).hexdigest()
-    return cleaned, sha256, save_ext
+    def encode(im: Image.Image) -> bytes:
+        # Re-saving without metadata strips EXIF
+        buf = io.BytesIO()
+        im.save(buf, format=save_fmt, quality=95)
+        return buf.getvalue()
+
+    original = None
+    try:
+        if settings.keep_original_upload:
+            # Full size, but oriented like the normalized copy and thumbnail
+            original = encode(ImageOps.exif_transpose(img))
+            img = Image.open(io.BytesIO(data))
+        if img.mode == "P":
+            # Palette images resize with NEAREST; expand first
+            img = img.convert("RGBA")
+        if settings.upload_max_side:
+            img.thumbnail((settings.upload_max_side, settings.upload_max_side))
+        # EXIF is about to be dropped — bake its rotation into the pixels
+        img = ImageOps.exif_transpose(img)
+        normalized = encode(img)
+    except Exception as e:
+        raise ImageValidationError(f"Invalid image data: {e}")
+
+    sha256 = hashlib.sha256(normalized).hexdigest()
+    return normalized, sha256, save_ext, original
 
 
 def make_thumbnail(data: bytes, thumb_path: Path) -> None:
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+
+class JobSnapshotCache:
+    """Bounded LRU of serialized GET /api/job/{id} responses with a strong ETag.
+
+    WorkerBridge patches entries on progress and drops them when a job
+    changes state, so an unchanged poll is answered from memory (or with
+    a 304) without a DB round trip. The TTL bounds staleness from writes
+    this process does not see (other server processes, direct DB edits).
+    """
+
+    def __init__(self, max_entries: int, ttl_s: float, pending_ttl_s: float):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.pending_ttl_s = pending_ttl_s
+        # job_id -> (snapshot dict, body bytes, etag, expires_at)
+        self._entries: OrderedDict[str, tuple[dict, bytes, str, float]] = OrderedDict()
+        # Bumped by every invalidation; a snapshot built from a DB read that
+        # started before one is served but not stored
+        self.epoch = 0
+
+    def get(self, job_id: str) -> tuple[bytes, str] | None:
+        """(body, etag) for a fresh entry, or None."""
+        entry = self._entries.get(job_id)
+        if entry is None:
+            return None
+        if entry[3] < time.monotonic():
+            del self._entries[job_id]
+            return None
+        self._entries.move_to_end(job_id)
+        return entry[1], entry[2]
+
+    def put(self, job_id: str, snapshot: dict, epoch: int | None = None) -> tuple[bytes, str]:
+        """Serialize and store snapshot; returns (body, etag).
+
+        Pass the epoch read before loading the job from the DB: if anything
+        was invalidated since, the snapshot may be stale and is not stored.
+        """
+        body = json.dumps(snapshot, separators=(",", ":")).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        if epoch is not None and epoch != self.epoch:
+            return body, etag
+        ttl = self.pending_ttl_s if snapshot.get("status") == "pending" else self.ttl_s
+        self._entries[job_id] = (snapshot, body, etag, time.monotonic() + ttl)
+        self._entries.move_to_end(job_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return body, etag
+
+    def patch(self, job_id: str, **fields) -> None:
+        """Update fields of a cached snapshot in place (new body and ETag)."""
+        entry = self._entries.get(job_id)
+        if entry is not None:
+            self.put(job_id, {**entry[0], **fields})
+
+    def invalidate(self, job_id: str) -> None:
+        self.epoch += 1
+        self._entries.pop(job_id, None)
+
+    def invalidate_pending(self) -> None:
+        """Drop pending snapshots; their queue_position moves on every dispatch."""
+        self.epoch += 1
+        for job_id in [j for j, e in self._entries.items() if e[0].get("status") == "pending"]:
+            del self._entries[job_id]
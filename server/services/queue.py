@@ -1,11 +1,28 @@
+import hashlib
+import json
 from datetime import datetime, timedelta
 
-from sqlalchemy import select, func
+from sqlalchemy import or_, select, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
 from database import _is_sqlite
 from models.job import Job, JobStatus
+from services import storage
+
+
+# Postgres NOTIFY channel: "a job became pending" (wakes every server process)
+PENDING_CHANNEL = "ptp_job_pending"
+
+
+async def notify_pending(session: AsyncSession) -> None:
+    """Queue a NOTIFY on PENDING_CHANNEL, delivered when session commits.
+
+    No-op on SQLite, which is single-process anyway.
+    """
+    if not _is_sqlite:
+        await session.execute(text("SELECT pg_notify(:channel, '')"),
+                              {"channel": PENDING_CHANNEL})
 
 
 async def enqueue(session: AsyncSession, job: Job) -> Job:
@@ -23,7 +40,7 @@ async def get_next_pending(session: AsyncSession) -> Job | None:
     """
     stmt = (
         select(Job)
-        .where(Job.status == JobStatus.pending)
+        .where(Job.status == JobStatus.pending, Job.upload_path != "")
         .order_by(Job.created_at)
         .limit(1)
     )
@@ -53,11 +70,14 @@ async def mark_complete(
     *,
     stl_path: str,
     glb_path: str | None = None,
+    web_glb_path: str | None = None,
     vertex_count: int,
     face_count: int,
     is_watertight: bool,
     generation_time_s: float,
+    mesh_stats: dict | None = None,
     gpu_metrics: dict | None = None,
+    spans: list | None = None,
 ) -> Job | None:
     result = await session.execute(select(Job).where(Job.id == job_id))
     job = result.scalar_one_or_none()
@@ -66,11 +86,14 @@ async def mark_complete(
     job.status = JobStatus.complete
     job.stl_path = stl_path
     job.glb_path = glb_path
+    job.web_glb_path = web_glb_path
     job.vertex_count = vertex_count
     job.face_count = face_count
     job.is_watertight = is_watertight
     job.generation_time_s = generation_time_s
+    job.mesh_stats = mesh_stats
     job.gpu_metrics = gpu_metrics
+    job.spans = spans
     job.completed_at = datetime.utcnow()
     job.progress_pct = 100
     job.current_step = "complete"
@@ -115,6 +138,28 @@ async def expire_stale_jobs(session: AsyncSession) -> list[str]:
     return expired_ids
 
 
+async def requeue_jobs(session: AsyncSession, job_ids: list[str] | None = None) -> list[str]:
+    """Put assigned/processing jobs back to pending (all of them if job_ids is None)."""
+    stmt = select(Job).where(Job.status.in_([JobStatus.assigned, JobStatus.processing]))
+    if job_ids is not None:
+        if not job_ids:
+            return []
+        stmt = stmt.where(Job.id.in_(job_ids))
+    result = await session.execute(stmt)
+    requeued = []
+    for job in result.scalars().all():
+        job.status = JobStatus.pending
+        job.assigned_at = None
+        job.current_step = None
+        job.progress_pct = 0
+        job.progress_message = None
+        requeued.append(job.id)
+    if requeued:
+        await notify_pending(session)
+        await session.commit()
+    return requeued
+
+
 async def pending_count(session: AsyncSession) -> int:
     result = await session.execute(
         select(func.count()).select_from(Job).where(Job.status == JobStatus.pending)
@@ -122,6 +167,29 @@ async def pending_count(session: AsyncSession) -> int:
     return result.scalar_one()
 
 
+async def queue_hint(session: AsyncSession) -> dict:
+    """Pending count and predicted seconds until the next job, for the worker.
+
+    With jobs pending the next one is due now. Otherwise arrivals are
+    treated as memoryless: the expected wait is the mean gap between
+    worker-bound uploads over the last queue_hint_window_s, or None when
+    there were none.
+    """
+    pending = await pending_count(session)
+    if pending:
+        return {"pending": pending, "next_arrival_s": 0.0}
+
+    window = settings.queue_hint_window_s
+    result = await session.execute(
+        select(func.count()).select_from(Job).where(
+            Job.created_at >= datetime.utcnow() - timedelta(seconds=window),
+            Job.cached_from.is_(None),
+        )
+    )
+    recent = result.scalar_one()
+    return {"pending": 0, "next_arrival_s": round(window / recent, 1) if recent else None}
+
+
 async def get_queue_summary(session: AsyncSession) -> dict:
     """Return counts by status."""
     result = await session.execute(
@@ -129,3 +197,97 @@ async def get_queue_summary(session: AsyncSession) -> dict:
     )
     counts = {row[0]: row[1] for row in result.all()}
     return {s.value: counts.get(s, 0) for s in JobStatus}
+
+
+# ─── Result cache ──────────────────────────────────────────────
+
+
+def compute_cache_key(image_hash: str, job_settings: dict) -> str:
+    """Hash of the image and its generation settings.
+
+    Numbers are normalized (5 == 5.0) and keys sorted so equivalent
+    settings dicts map to the same key.
+    """
+    normalized = {
+        k: float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+        for k, v in sorted((job_settings or {}).items())
+    }
+    payload = json.dumps([image_hash, normalized], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def find_cached_result(session: AsyncSession, cache_key: str) -> Job | None:
+    """Return the newest completed job with this cache key whose STL still exists."""
+    result = await session.execute(
+        select(Job)
+        .where(
+            Job.cache_key == cache_key,
+            Job.status == JobStatus.complete,
+            Job.stl_path.is_not(None),
+        )
+        .order_by(Job.completed_at.desc())
+        .limit(5)
+    )
+    for job in result.scalars().all():
+        try:
+            if storage.get_output_path(job.stl_path).exists():
+                return job
+        except ValueError:
+            continue
+    return None
+
+
+def link_cached_result(job: Job, source: Job) -> None:
+    """Complete job instantly by pointing it at source's artifacts."""
+    job.status = JobStatus.complete
+    job.cached_from = source.cached_from or source.id
+    job.stl_path = source.stl_path
+    job.glb_path = source.glb_path
+    job.web_glb_path = source.web_glb_path
+    job.preview_path = source.preview_path
+    job.turntable_path = source.turntable_path
+    job.vertex_count = source.vertex_count
+    job.face_count = source.face_count
+    job.is_watertight = source.is_watertight
+    job.mesh_stats = source.mesh_stats
+    job.generation_time_s = 0.0
+    job.progress_pct = 100
+    job.current_step = "complete"
+    job.progress_message = "Identical upload — reused cached result"
+    job.completed_at = datetime.utcnow()
+
+
+async def artifact_refcount(session: AsyncSession, rel_path: str, exclude_id: str) -> int:
+    """Number of other jobs linking to an output artifact."""
+    result = await session.execute(
+        select(func.count())
+        .select_from(Job)
+        .where(
+            Job.id != exclude_id,
+            or_(
+                Job.stl_path == rel_path,
+                Job.glb_path == rel_path,
+                Job.web_glb_path == rel_path,
+                Job.preview_path == rel_path,
+                Job.turntable_path == rel_path,
+            ),
+        )
+    )
+    return result.scalar_one()
+
+
+async def release_job_files(session: AsyncSession, job: Job) -> None:
+    """Delete a job's files, keeping output artifacts other jobs still link to.
+
+    Uploads and thumbnails are per job and never shared.
+    """
+    async def unshared(rel: str | None) -> str | None:
+        if rel and await artifact_refcount(session, rel, job.id) == 0:
+            return rel
+        return None
+
+    outputs = [await unshared(rel) for rel in (job.stl_path, job.glb_path, job.web_glb_path,
+                                               job.preview_path, job.turntable_path)]
+    storage.delete_job_files(job.upload_path, *outputs, storage.preview_mesh_rel(job.id),
+                             original_path=job.original_path,
+                             thumbnail_path=job.thumbnail_path)
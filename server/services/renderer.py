@@ -0,0 +1,289 @@
+"""CPU-only mesh preview renderer.
+
+A small NumPy z-buffer rasterizer for STL/GLB files: flat-shaded stills and
+turntable animations, written as WebP. No OpenGL/EGL, so it runs on the
+headless VPS for every completed job.
+"""
+
+import json
+import logging
+import struct
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger("renderer")
+
+PREVIEW_SIZE = 512
+TURNTABLE_SIZE = 256
+TURNTABLE_FRAMES = 24
+TURNTABLE_FPS = 12
+ELEVATION_DEG = 20.0
+SUPERSAMPLE = 2
+
+_CLAY = np.array([0.82, 0.79, 0.74])
+_AMBIENT = 0.28
+_LIGHT = np.array([-0.45, -0.75, 0.55])  # view space: camera looks along +y
+_LIGHT = _LIGHT / np.linalg.norm(_LIGHT)
+
+_MAX_CANDIDATES = 4_000_000  # pixel candidates per rasterization chunk
+
+
+# ─── Loading ───────────────────────────────────────────────────
+
+
+def load_mesh(path: str | Path) -> tuple[np.ndarray, np.ndarray]:
+    """Load an STL or GLB as (vertices (n,3) float32, faces (m,3) int64)."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic == b"glTF":
+        return _load_glb(path)
+    return _load_stl(path)
+
+
+def _load_stl(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        f.seek(80)
+        count = struct.unpack("<I", f.read(4))[0] if size >= 84 else -1
+        if size == 84 + 50 * count:
+            dtype = np.dtype([("normal", "<f4", (3,)), ("tri", "<f4", (3, 3)), ("attr", "<u2")])
+            tris = np.fromfile(f, dtype=dtype, count=count)["tri"]
+        else:
+            f.seek(0)
+            lines = [ln.split()[1:4] for ln in f.read().decode(errors="ignore").splitlines()
+                     if ln.lstrip().startswith("vertex")]
+            tris = np.asarray(lines, dtype=np.float32).reshape(-1, 3, 3)
+    vertices = tris.reshape(-1, 3).astype(np.float32)
+    faces = np.arange(len(vertices), dtype=np.int64).reshape(-1, 3)
+    return vertices, faces
+
+
+_GLTF_COMPONENTS = {5120: np.int8, 5121: np.uint8, 5122: np.int16,
+                    5123: np.uint16, 5125: np.uint32, 5126: np.float32}
+_GLTF_WIDTH = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+
+
+def _read_accessor(gltf: dict, binary: bytes, index: int) -> np.ndarray:
+    acc = gltf["accessors"][index]
+    view = gltf["bufferViews"][acc["bufferView"]]
+    dtype = np.dtype(_GLTF_COMPONENTS[acc["componentType"]])
+    width = _GLTF_WIDTH[acc["type"]]
+    offset = view.get("byteOffset", 0) + acc.get("byteOffset", 0)
+    stride = view.get("byteStride", 0) or dtype.itemsize * width
+
+    raw = np.frombuffer(binary, dtype=np.uint8, count=stride * (acc["count"] - 1)
+                        + dtype.itemsize * width, offset=offset)
+    rows = np.lib.stride_tricks.as_strided(
+        raw, shape=(acc["count"], dtype.itemsize * width), strides=(stride, 1))
+    out = np.ascontiguousarray(rows).view(dtype).reshape(acc["count"], width)
+    if acc.get("normalized") and dtype.kind in "iu":
+        out = np.maximum(out / np.iinfo(dtype).max, -1.0)
+    return out
+
+
+def _node_matrix(node: dict) -> np.ndarray:
+    if "matrix" in node:
+        return np.asarray(node["matrix"], dtype=np.float64).reshape(4, 4).T
+    m = np.eye(4)
+    x, y, z, w = node.get("rotation", (0, 0, 0, 1))
+    m[:3, :3] = [
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ]
+    m[:3, :3] *= np.asarray(node.get("scale", (1, 1, 1)))
+    m[:3, 3] = node.get("translation", (0, 0, 0))
+    return m
+
+
+def _load_glb(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    data = path.read_bytes()
+    json_len = struct.unpack_from("<I", data, 12)[0]
+    gltf = json.loads(data[20:20 + json_len])
+    bin_start = 20 + json_len
+    binary = data[bin_start + 8:] if len(data) > bin_start else b""
+
+    all_v, all_f, base = [], [], 0
+
+    def visit(node_idx: int, parent: np.ndarray):
+        nonlocal base
+        node = gltf["nodes"][node_idx]
+        world = parent @ _node_matrix(node)
+        for prim in gltf["meshes"][node["mesh"]]["primitives"] if "mesh" in node else []:
+            if prim.get("mode", 4) != 4:
+                continue
+            verts = _read_accessor(gltf, binary, prim["attributes"]["POSITION"]).astype(np.float64)
+            verts = verts @ world[:3, :3].T + world[:3, 3]
+            if "indices" in prim:
+                faces = _read_accessor(gltf, binary, prim["indices"]).astype(np.int64).reshape(-1, 3)
+            else:
+                faces = np.arange(len(verts), dtype=np.int64).reshape(-1, 3)
+            all_v.append(verts.astype(np.float32))
+            all_f.append(faces + base)
+            base += len(verts)
+        for child in node.get("children", []):
+            visit(child, world)
+
+    scene = gltf.get("scenes", [{}])[gltf.get("scene", 0)]
+    for root in scene.get("nodes", range(len(gltf.get("nodes", [])))):
+        visit(root, np.eye(4))
+
+    if not all_v:
+        raise ValueError(f"No triangle meshes in {path.name}")
+    return np.concatenate(all_v), np.concatenate(all_f)
+
+
+# ─── Rasterization ─────────────────────────────────────────────
+
+
+def _view_rotation(azimuth_deg: float, elevation_deg: float) -> np.ndarray:
+    """Turn a Z-up model about Z, then tilt so the camera looks slightly down."""
+    a, e = np.radians(azimuth_deg), np.radians(elevation_deg)
+    rz = np.array([[np.cos(a), -np.sin(a), 0], [np.sin(a), np.cos(a), 0], [0, 0, 1]])
+    rx = np.array([[1, 0, 0], [0, np.cos(e), -np.sin(e)], [0, np.sin(e), np.cos(e)]])
+    return rx @ rz
+
+
+def _raster_bucket(tri: np.ndarray, k: int, size: int):
+    """Rasterize triangles whose pixel bbox fits in k×k. Yields (pix, depth, idx)."""
+    offsets = np.stack(np.meshgrid(np.arange(k), np.arange(k)), -1).reshape(-1, 2)
+    per_chunk = max(1, _MAX_CANDIDATES // (k * k))
+
+    for start in range(0, len(tri), per_chunk):
+        t = tri[start:start + per_chunk]
+        origin = np.floor(np.minimum(np.minimum(t[:, 0, :2], t[:, 1, :2]), t[:, 2, :2])).astype(np.int64)
+        px = origin[:, None, 0] + offsets[None, :, 0]
+        py = origin[:, None, 1] + offsets[None, :, 1]
+        cx, cy = (px + 0.5).astype(t.dtype), (py + 0.5).astype(t.dtype)
+
+        (x0, y0, z0), (x1, y1, z1), (x2, y2, z2) = (t[:, i, :].T for i in range(3))
+        area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+        area = np.where(np.abs(area) < 1e-12, np.nan, area)[:, None]
+        w0 = ((x1[:, None] - cx) * (y2[:, None] - cy) - (x2[:, None] - cx) * (y1[:, None] - cy)) / area
+        w1 = ((x2[:, None] - cx) * (y0[:, None] - cy) - (x0[:, None] - cx) * (y2[:, None] - cy)) / area
+        w2 = 1.0 - w0 - w1
+
+        inside = ((w0 >= -1e-6) & (w1 >= -1e-6) & (w2 >= -1e-6)
+                  & (px >= 0) & (px < size) & (py >= 0) & (py < size))
+        rows, cols = np.nonzero(inside)
+        depth = (w0 * z0[:, None] + w1 * z1[:, None] + w2 * z2[:, None])[rows, cols]
+        yield py[rows, cols] * size + px[rows, cols], depth, rows + start
+
+
+def _bounding_sphere(vertices: np.ndarray) -> tuple[np.ndarray, float]:
+    center = (vertices.min(axis=0) + vertices.max(axis=0)) / 2
+    radius = float(np.linalg.norm(vertices - center, axis=1).max()) or 1.0
+    return center, radius
+
+
+def render(vertices: np.ndarray, faces: np.ndarray, size: int = PREVIEW_SIZE,
+           azimuth_deg: float = 30.0, elevation_deg: float = ELEVATION_DEG,
+           supersample: int = SUPERSAMPLE, sphere: tuple = None) -> Image.Image:
+    """Render one flat-shaded RGBA view of a Z-up mesh on a transparent background.
+
+    sphere is an optional precomputed (center, radius) framing, so turntable
+    frames skip recomputing it.
+    """
+    ss = size * supersample
+    center, radius = sphere or _bounding_sphere(vertices)
+
+    rot = _view_rotation(azimuth_deg, elevation_deg).astype(np.float32)
+    v = (vertices - center.astype(np.float32)) @ rot.T
+    tri_view = v[faces]
+
+    # Flat shading: face normal turned toward the camera (two-sided)
+    normals = np.cross(tri_view[:, 1] - tri_view[:, 0], tri_view[:, 2] - tri_view[:, 0])
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True) + 1e-12
+    normals *= np.where(normals[:, 1] > 0, -1.0, 1.0)[:, None]
+    shade = _AMBIENT + (1 - _AMBIENT) * np.clip(normals @ _LIGHT.astype(np.float32), 0, 1)
+
+    # Orthographic projection: x → right, z → up, y → depth (smaller = nearer)
+    scale = ss * 0.47 / radius
+    tri = np.empty_like(tri_view)
+    tri[..., 0] = tri_view[..., 0] * scale + ss / 2
+    tri[..., 1] = ss / 2 - tri_view[..., 2] * scale
+    tri[..., 2] = tri_view[..., 1]
+
+    # Pixel bbox per triangle; elementwise min/max beats axis reductions on (n,3,3)
+    lo = np.minimum(np.minimum(tri[:, 0, :2], tri[:, 1, :2]), tri[:, 2, :2])
+    hi = np.maximum(np.maximum(tri[:, 0, :2], tri[:, 1, :2]), tri[:, 2, :2])
+    span = np.ceil(hi) - np.floor(lo)
+    extent = np.maximum(span[:, 0], span[:, 1])
+
+    pix, depth, idx = [], [], []
+
+    # Sub-pixel triangles: splat the centroid
+    tiny = np.nonzero(extent <= 1)[0]
+    if len(tiny):
+        c = (tri[tiny, 0] + tri[tiny, 1] + tri[tiny, 2]) / 3
+        px, py = c[:, 0].astype(np.int64), c[:, 1].astype(np.int64)
+        ok = (px >= 0) & (px < ss) & (py >= 0) & (py < ss)
+        pix.append((py * ss + px)[ok])
+        depth.append(c[ok, 2])
+        idx.append(tiny[ok])
+
+    # Larger triangles: bucket by power-of-two footprint
+    k = 2
+    while True:
+        sel = np.nonzero((extent > k // 2) & (extent <= k) & (extent > 1))[0]
+        if len(sel):
+            for p, d, i in _raster_bucket(tri[sel], k, ss):
+                pix.append(p)
+                depth.append(d)
+                idx.append(sel[i])
+        if k >= extent.max(initial=0):
+            break
+        k *= 2
+
+    rgba = np.zeros((ss * ss, 4), dtype=np.uint8)
+    if pix:
+        pix = np.concatenate(pix)
+        depth = np.concatenate(depth)
+        idx = np.concatenate(idx)
+
+        # Z-buffer: nearest fragment per pixel (ties go to any one of them)
+        zbuf = np.full(ss * ss, np.inf, dtype=depth.dtype)
+        np.minimum.at(zbuf, pix, depth)
+        win = np.nonzero(depth == zbuf[pix])[0]
+
+        rgba[pix[win], :3] = np.clip(shade[idx[win], None] * _CLAY * 255, 0, 255)
+        rgba[pix[win], 3] = 255
+
+    img = Image.fromarray(rgba.reshape(ss, ss, 4), "RGBA")
+    return img.reduce(supersample) if supersample > 1 else img
+
+
+# ─── Outputs ───────────────────────────────────────────────────
+
+
+def render_still(vertices: np.ndarray, faces: np.ndarray, out_path: str | Path,
+                 size: int = PREVIEW_SIZE) -> Path:
+    out_path = Path(out_path)
+    render(vertices, faces, size=size).save(out_path, format="WEBP", quality=85)
+    return out_path
+
+
+def render_turntable(vertices: np.ndarray, faces: np.ndarray, out_path: str | Path,
+                     size: int = TURNTABLE_SIZE, frames: int = TURNTABLE_FRAMES,
+                     fps: int = TURNTABLE_FPS) -> Path:
+    out_path = Path(out_path)
+    sphere = _bounding_sphere(vertices)
+    # Frames are small and lossy-encoded anyway; skip supersampling to keep
+    # the 24-frame loop to a few seconds on large meshes.
+    images = [render(vertices, faces, size=size, azimuth_deg=360.0 * i / frames,
+                     supersample=1, sphere=sphere)
+              for i in range(frames)]
+    images[0].save(out_path, format="WEBP", save_all=True, append_images=images[1:],
+                   duration=round(1000 / fps), loop=0, quality=75)
+    return out_path
+
+
+def render_job_previews(mesh_path: str | Path, still_path: str | Path,
+                        turntable_path: str | Path) -> None:
+    """Load a mesh once and write its preview still and turntable. Blocking."""
+    vertices, faces = load_mesh(mesh_path)
+    render_still(vertices, faces, still_path)
+    render_turntable(vertices, faces, turntable_path)
@@ -0,0 +1,24 @@
+import hashlib
+import hmac
+import time
+from urllib.parse import urlencode
+
+from config import settings
+
+
+def _signature(path: str, expires: int) -> str:
+    msg = f"{path}\n{expires}".encode()
+    return hmac.new(settings.worker_auth_token.encode(), msg, hashlib.sha256).hexdigest()
+
+
+def sign(path: str, ttl_s: int | None = None) -> str:
+    """Append an expiry and HMAC signature to a server-relative path."""
+    expires = int(time.time()) + (settings.signed_url_ttl_s if ttl_s is None else ttl_s)
+    return f"{path}?{urlencode({'expires': expires, 'sig': _signature(path, expires)})}"
+
+
+def verify(path: str, expires: int, sig: str) -> bool:
+    """True if sig matches path and expires has not passed."""
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sig, _signature(path, expires))
@@ -1,4 +1,6 @@
+import os
 from pathlib import Path
+from typing import BinaryIO
 
 from config import settings
 
@@ -26,6 +28,23 @@ def save_output(data: bytes, relative_path: str) -> Path:
     return target
 
 
+def open_partial_output(relative_path: str, offset: int = 0) -> BinaryIO:
+    """Open an output file for streaming writes at offset, dropping anything past it."""
+    target = _safe_resolve(settings.output_dir, relative_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    f = open(target, "r+b" if target.exists() else "wb")
+    f.truncate(offset)
+    f.seek(offset)
+    return f
+
+
+def finalize_output(partial_path: str, relative_path: str) -> Path:
+    """Atomically move a completed partial output into place."""
+    target = _safe_resolve(settings.output_dir, relative_path)
+    os.replace(_safe_resolve(settings.output_dir, partial_path), target)
+    return target
+
+
 def get_upload_path(relative: str) -> Path:
     return _safe_resolve(settings.upload_dir, relative)
 
@@ -34,11 +53,19 @@ def get_output_path(relative: str) -> Path:
     return _safe_resolve(settings.output_dir, relative)
 
 
-def delete_job_files(upload_path: str | None, stl_path: str | None, glb_path: str | None) -> None:
+def preview_mesh_rel(job_id: str) -> str:
+    """Output-relative path of a job's temporary low-res preview GLB."""
+    return f"{job_id}/preview_lowres.glb"
+
+
+def delete_job_files(upload_path: str | None, *output_paths: str | None,
+                     original_path: str | None = None,
+                     thumbnail_path: str | None = None) -> None:
     for rel, base in [
         (upload_path, settings.upload_dir),
-        (stl_path, settings.output_dir),
-        (glb_path, settings.output_dir),
+        (original_path, settings.upload_dir),
+        (thumbnail_path, settings.upload_dir),
+        *((p, settings.output_dir) for p in output_paths),
     ]:
         if rel:
             try:
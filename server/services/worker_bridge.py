@@ -1,99 +1,427 @@
 import asyncio
 import base64
+import hashlib
+import json
 import logging
+import struct
+import time
+from collections import deque
 from datetime import datetime, timezone
+from uuid import uuid4
 
 from fastapi import WebSocket
 from sqlmodel.ext.asyncio.session import AsyncSession as SQLModelAsyncSession
 
 from config import settings
-from database import engine
+from database import _is_sqlite, engine
 from models.audit_log import AuditLog
-from services import queue, storage
+from services import queue, renderer, signed_url, storage
+from services.job_cache import JobSnapshotCache
 
 logger = logging.getLogger("worker_bridge")
 
+# Binary artifact frame: 16-byte transfer id, uint32 seq, uint64 offset, then payload
+CHUNK_HEADER = struct.Struct("!16sIQ")
+
+# Artifact kind -> file name under the job's output directory
+ARTIFACT_FILES = {"stl": "model.stl", "glb": "model.glb", "web_glb": "model.web.glb"}
+
+# Client events after which a job's stream ends
+TERMINAL_EVENTS = ("complete", "failed")
+
+
+class Subscriber:
+    """One client's bounded outbox.
+
+    Fan-out only ever enqueues. Once maxsize events are queued, each new
+    one evicts the oldest queued progress update; status, preview and
+    terminal events are never dropped, so a slow reader loses only stale
+    progress and never stalls the worker loop.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.pending: deque[tuple[int, dict]] = deque()
+        self.dropped = 0
+        self.task: asyncio.Task | None = None
+        self._ready = asyncio.Event()
+
+    def offer(self, event: tuple[int, dict]) -> None:
+        if len(self.pending) >= self.maxsize:
+            for i, (_, message) in enumerate(self.pending):
+                if message["type"] == "progress":
+                    del self.pending[i]
+                    self.dropped += 1
+                    break
+        self.pending.append(event)
+        self._ready.set()
+
+    async def get(self) -> tuple[int, dict]:
+        while not self.pending:
+            self._ready.clear()
+            await self._ready.wait()
+        return self.pending.popleft()
+
+
+class JobEvents:
+    """Ring buffer of one job's recent client events, numbered for SSE resume."""
+
+    def __init__(self, maxlen: int):
+        self.events: deque[tuple[int, dict]] = deque(maxlen=maxlen)
+        self.next_id = 1
+        self.preview: tuple[int, dict] | None = None  # survives ring eviction
+        self.finished = False
+
+    def append(self, message: dict) -> tuple[int, dict]:
+        event = (self.next_id, message)
+        self.next_id += 1
+        self.events.append(event)
+        if message["type"] == "preview":
+            self.preview = event
+        self.finished = message["type"] in TERMINAL_EVENTS
+        return event
+
+    def replay(self, last_id: int | None) -> list[tuple[int, dict]]:
+        """Events after last_id; a fresh client, or one whose gap was evicted,
+        gets the preview (if any) and the latest event instead."""
+        if (last_id is not None and self.events
+                and self.events[0][0] <= last_id + 1 <= self.next_id):
+            return [e for e in self.events if e[0] > last_id]
+        latest = [self.preview] if self.preview else []
+        if self.events and self.events[-1] is not self.preview:
+            latest.append(self.events[-1])
+        return latest
+
+
+class ConnectedWorker:
+    """One worker WebSocket: capabilities, live GPU status and in-flight jobs."""
+
+    def __init__(self, ws: WebSocket):
+        self.id = uuid4().hex[:8]
+        self.ws = ws
+        self.info: dict = {}  # gpu_name, vram_total_gb, worker_version, hostname
+        self.gpu_status: dict = {}
+        self.jobs: set[str] = set()
+        self.max_jobs: int = 1
+        self.paused: bool = False
+        self.draining: bool = False  # finish in-flight jobs, take no new ones
+        self.greeted: bool = False  # worker_hello received (it may be mid-job)
+        self.connected_at = datetime.now(timezone.utc)
+        # Recent model tier changes (hot/warm/cold) reported in heartbeats
+        self.model_tier_history: deque[dict] = deque(maxlen=50)
+
+    @property
+    def eligible(self) -> bool:
+        return (self.greeted and not self.paused and not self.draining
+                and len(self.jobs) < self.max_jobs
+                and self.gpu_status.get("available", True) is not False)
+
+    def load_key(self) -> tuple:
+        """Sort key for least-loaded dispatch: fewest jobs, then most free VRAM."""
+        return (len(self.jobs), -(self.gpu_status.get("vram_free_gb") or 0))
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "info": self.info,
+            "gpu_status": self.gpu_status,
+            "jobs": sorted(self.jobs),
+            "max_jobs": self.max_jobs,
+            "paused": self.paused,
+            "draining": self.draining,
+            "drained": self.draining and not self.jobs,
+            "connected_at": self.connected_at.isoformat(),
+            "model_tier_history": list(self.model_tier_history),
+        }
+
+
+class ArtifactTransfer:
+    """One chunked artifact upload, written straight to a partial file.
+
+    Keyed by the worker's transfer id and kept across worker reconnects,
+    so an interrupted upload resumes at offset rather than restarting.
+    """
+
+    def __init__(self, transfer_id: str, job_id: str, kind: str, size: int):
+        self.id = transfer_id
+        self.job_id = job_id
+        self.kind = kind
+        self.size = size
+        self.rel = f"{job_id}/{ARTIFACT_FILES[kind]}"
+        self.partial = f"{self.rel}.{transfer_id}.part"
+        self.offset = 0
+        self.seq = 0
+        self.sha256 = hashlib.sha256()
+        self.file = None
+
+    def recover(self) -> None:
+        """Rebuild offset and hash from a partial left on disk (server restart)."""
+        path = storage.get_output_path(self.partial)
+        if not path.exists():
+            return
+        with open(path, "rb") as f:
+            while block := f.read(1 << 20):
+                self.sha256.update(block)
+                self.offset += len(block)
+
+    def write(self, payload: memoryview) -> None:
+        self.file.write(payload)
+        self.sha256.update(payload)
+        self.offset += len(payload)
+        self.seq += 1
+
+    def reset(self) -> None:
+        """Start over from byte 0 (hash mismatch)."""
+        self.file.close()
+        self.file = storage.open_partial_output(self.partial, 0)
+        self.offset = self.seq = 0
+        self.sha256 = hashlib.sha256()
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+            self.file = None
+
 
 class WorkerBridge:
-    """Manages the worker WebSocket connection, job dispatch, and client fan-out."""
+    """Manages the worker WebSocket connections, job dispatch, and client fan-out."""
 
     def __init__(self):
-        self.worker_ws: WebSocket | None = None
-        self.worker_info: dict = {}
-        self.gpu_status: dict = {}
-        self.paused: bool = False
+        self.workers: dict[str, ConnectedWorker] = {}
+        self.paused: bool = False  # global pause — no dispatch to any worker
+
+        # Client progress subscriptions: job_id -> {WebSocket or SSE key: Subscriber}
+        self._subscribers: dict[str, dict[object, Subscriber]] = {}
+        self._events: dict[str, JobEvents] = {}  # replay buffers for SSE reconnects
 
-        # Client progress subscriptions: job_id -> set of WebSocket connections
-        self._subscribers: dict[str, set[WebSocket]] = {}
+        # GET /api/job responses, kept current by the handlers below
+        self.snapshots = JobSnapshotCache(settings.job_cache_size, settings.job_cache_ttl_s,
+                                          settings.job_cache_pending_ttl_s)
+
+        # Live progress per active job (authoritative; the DB copy is debounced)
+        self._progress: dict[str, dict] = {}
+        self._progress_dirty: set[str] = set()
+        self._flush_pending = False
         self._dispatch_task: asyncio.Task | None = None
+        self._hint_task: asyncio.Task | None = None
+        self._listen_task: asyncio.Task | None = None
+        self._dispatch_wake = asyncio.Event()
+        self._background: set[asyncio.Task] = set()  # renders, re-queues
+        self._rendering: set[str] = set()  # job ids with a preview render in flight
+
+        # Chunked artifact uploads: transfer_id -> transfer, and per-job
+        # finished artifacts (kind -> output-relative path) awaiting job_complete
+        self._transfers: dict[str, ArtifactTransfer] = {}
+        self._received: dict[str, dict[str, str]] = {}
 
     # ─── Client subscription ───────────────────────────────────────
 
     def subscribe(self, job_id: str, ws: WebSocket) -> None:
-        self._subscribers.setdefault(job_id, set()).add(ws)
-
-    def unsubscribe(self, job_id: str, ws: WebSocket) -> None:
+        sub = Subscriber(settings.subscriber_queue_size)
+        sub.task = asyncio.create_task(self._pump(job_id, ws, sub))
+        self._subscribers.setdefault(job_id, {})[ws] = sub
+
+    def open_stream(
+        self, job_id: str, last_event_id: int | None, create: bool = False
+    ) -> tuple[list[tuple[int, dict]], Subscriber] | None:
+        """
+        Subscribe a pull-based (SSE) client and return the events it missed.
+
+        Returns None when the job has no event buffer, i.e. it is not
+        active here, unless create is set; the caller then builds the
+        job's state from the DB. Replay and subscription happen without an
+        await in between, so no event can fall in the gap.
+        """
+        log = self._events.get(job_id)
+        if log is None:
+            if not create:
+                return None
+            log = self._event_log(job_id)
+        sub = Subscriber(settings.subscriber_queue_size)
+        self._subscribers.setdefault(job_id, {})[sub] = sub
+        return log.replay(last_event_id), sub
+
+    def unsubscribe(self, job_id: str, key: object) -> None:
         subs = self._subscribers.get(job_id)
         if subs:
-            subs.discard(ws)
+            sub = subs.pop(key, None)
+            if sub and sub.task and sub.task is not asyncio.current_task():
+                sub.task.cancel()
             if not subs:
                 del self._subscribers[job_id]
 
-    async def _fan_out(self, job_id: str, message: dict) -> None:
-        """Send message to all client WebSockets subscribed to this job."""
-        subs = self._subscribers.get(job_id, set()).copy()
-        for ws in subs:
-            try:
+    async def _pump(self, job_id: str, ws: WebSocket, sub: Subscriber) -> None:
+        """Drain one subscriber's outbox into its WebSocket."""
+        try:
+            while True:
+                _, message = await sub.get()
                 await ws.send_json(message)
-            except Exception:
-                self.unsubscribe(job_id, ws)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            self.unsubscribe(job_id, ws)
+        if sub.dropped:
+            logger.info("Subscriber to %s missed %d stale update(s)", job_id, sub.dropped)
+
+    def _fan_out(self, job_id: str, message: dict) -> None:
+        """Record message in the job's event buffer and queue it for every
+        subscribed client; never blocks."""
+        log = self._events.get(job_id) or self._event_log(job_id)
+        event = log.append(message)
+        for sub in self._subscribers.get(job_id, {}).values():
+            sub.offer(event)
+        if log.finished:
+            self._spawn(self._expire_events(job_id, log))
+
+    def _event_log(self, job_id: str) -> JobEvents:
+        while len(self._events) >= settings.event_log_max_jobs:
+            del self._events[next(iter(self._events))]  # oldest job first
+        log = self._events[job_id] = JobEvents(settings.event_log_size)
+        return log
+
+    async def _expire_events(self, job_id: str, log: JobEvents) -> None:
+        """Keep a finished job's buffer briefly so reconnecting clients see the end."""
+        await asyncio.sleep(settings.event_log_ttl_s)
+        if log.finished and self._events.get(job_id) is log:
+            del self._events[job_id]
+
+    def job_closed(self, job_id: str, error: str) -> None:
+        """Tell clients a job ended outside the worker flow (admin cancel, timeout).
+
+        Frees the job's worker slot at once; the worker is told to drop the
+        result when it next tries to upload.
+        """
+        for worker in self.workers.values():
+            worker.jobs.discard(job_id)
+        storage.delete_job_files(None, *self._drop_artifacts(job_id))
+        self.notify_dispatch()
+        self._forget_progress(job_id)
+        self.snapshots.invalidate(job_id)
+        self._fan_out(job_id, {"type": "failed", "job_id": job_id, "error": error, "step": None})
+
+    def live_progress(self, job_id: str) -> dict | None:
+        """Latest step/progress_pct/message for an active job, or None."""
+        return self._progress.get(job_id)
 
     # ─── Worker connection ─────────────────────────────────────────
 
     @property
     def worker_connected(self) -> bool:
-        return self.worker_ws is not None
+        return bool(self.workers)
 
     async def handle_worker(self, ws: WebSocket) -> None:
-        """Main loop for the worker WebSocket — call from the route handler."""
-        if self.worker_ws is not None:
-            await ws.close(code=4000, reason="Another worker already connected")
-            return
-
-        self.worker_ws = ws
-        await ws.send_json({"type": "welcome", "message": "Connected to server"})
-        logger.info("Worker connected")
-
-        # Start dispatch loop
-        self._dispatch_task = asyncio.create_task(self._dispatch_loop())
+        """Main loop for one worker WebSocket — call from the route handler."""
+        worker = ConnectedWorker(ws)
+        self.workers[worker.id] = worker
+        await ws.send_json({"type": "welcome", "message": "Connected to server",
+                            "worker_id": worker.id})
+        logger.info("Worker %s connected (%d total)", worker.id, len(self.workers))
+
+        # Dispatch, queue-hint and NOTIFY loops run while any worker is connected
+        if self._dispatch_task is None:
+            self._dispatch_task = asyncio.create_task(self._dispatch_loop())
+            self._hint_task = asyncio.create_task(self._queue_hint_loop())
+            if not _is_sqlite:
+                self._listen_task = asyncio.create_task(self._listen_loop())
+        self.notify_dispatch()
 
         try:
-            async for raw in ws.iter_json():
-                await self._handle_worker_message(raw)
+            while True:
+                message = await ws.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes") is not None:
+                    await self._handle_chunk(worker, message["bytes"])
+                elif message.get("text") is not None:
+                    await self._handle_worker_message(worker, json.loads(message["text"]))
         except Exception as e:
-            logger.warning("Worker disconnected: %s", e)
+            logger.warning("Worker %s disconnected: %s", worker.id, e)
         finally:
-            self.worker_ws = None
-            self.worker_info = {}
-            self.gpu_status = {}
-            if self._dispatch_task:
-                self._dispatch_task.cancel()
-                self._dispatch_task = None
-            logger.info("Worker disconnected, cleaned up")
-
-    async def _handle_worker_message(self, msg: dict) -> None:
+            del self.workers[worker.id]
+            if not self.workers:
+                for task in (self._dispatch_task, self._hint_task, self._listen_task):
+                    if task:
+                        task.cancel()
+                self._dispatch_task = self._hint_task = self._listen_task = None
+            # Detached: this handler may be mid-cancellation
+            self._spawn(self._requeue_in_flight(worker))
+            logger.info("Worker %s disconnected, cleaned up", worker.id)
+
+    def _spawn(self, coro) -> None:
+        """Run coro as a background task, keeping a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _requeue_in_flight(self, worker: ConnectedWorker) -> None:
+        """Hand a lost worker's unfinished jobs back to the queue.
+
+        Waits worker_resume_grace_s first: a worker that reconnects in time
+        re-claims the job in its worker_hello and resumes its uploads.
+        """
+        if not worker.jobs:
+            return
+        await asyncio.sleep(settings.worker_resume_grace_s)
+        claimed = set().union(*(w.jobs for w in self.workers.values()))
+        lost = [j for j in worker.jobs if j not in claimed]
+        if not lost:
+            return
+        for job_id in lost:
+            self._drop_artifacts(job_id)
+            self._forget_progress(job_id)
+        try:
+            requeued = await self._requeue(lost)
+            if requeued:
+                logger.info("Re-queued %d job(s) from worker %s", len(requeued), worker.id)
+        except Exception:
+            logger.exception("Failed to re-queue jobs from worker %s", worker.id)
+
+    async def _requeue(self, job_ids: list[str]) -> list[str]:
+        """Put job_ids back to pending and tell their clients."""
+        async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
+            requeued = await queue.requeue_jobs(session, job_ids)
+        self.snapshots.invalidate_pending()
+        for job_id in requeued:
+            self.snapshots.invalidate(job_id)
+            self._fan_out(job_id, {"type": "status", "job_id": job_id, "status": "pending",
+                                   "step": None, "progress_pct": 0, "message": None})
+        if requeued:
+            self.notify_dispatch()
+        return requeued
+
+    async def _reclaim(self, worker: ConnectedWorker, job_id: str) -> None:
+        """A reconnected worker still running job_id takes it back, unless the
+        job has since finished or another worker holds it."""
+        if any(job_id in w.jobs for w in self.workers.values() if w is not worker):
+            return
+        async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
+            from models.job import Job, JobStatus
+
+            job = await session.get(Job, job_id)
+        if job and job.status in (JobStatus.assigned, JobStatus.processing):
+            worker.jobs.add(job_id)
+            logger.info("Worker %s re-claimed running job %s", worker.id, job_id)
+
+    async def _handle_worker_message(self, worker: ConnectedWorker, msg: dict) -> None:
         msg_type = msg.get("type")
 
         if msg_type == "worker_hello":
-            self.worker_info = {
+            worker.info = {
                 "gpu_name": msg.get("gpu_name"),
                 "vram_total_gb": msg.get("vram_total_gb"),
                 "worker_version": msg.get("worker_version"),
+                "hostname": msg.get("hostname"),
             }
-            logger.info("Worker hello: %s", self.worker_info)
+            worker.max_jobs = max(1, int(msg.get("max_jobs") or 1))
+            if msg.get("current_job_id"):
+                await self._reclaim(worker, msg["current_job_id"])
+            worker.greeted = True
+            logger.info("Worker %s hello: %s", worker.id, worker.info)
+            self.notify_dispatch()
 
         elif msg_type == "gpu_status":
-            self.gpu_status = {
+            was_available = worker.gpu_status.get("available", True)
+            worker.gpu_status = {
                 "vram_free_gb": msg.get("vram_free_gb"),
                 "vram_used_gb": msg.get("vram_used_gb"),
                 "vram_total_gb": msg.get("vram_total_gb"),
@@ -101,10 +429,21 @@ class WorkerBridge:
                 "temp_c": msg.get("temp_c"),
                 "available": msg.get("available"),
                 "model_loaded": msg.get("model_loaded"),
+                "model_tier": msg.get("model_tier"),
+                "last_reload": msg.get("last_reload"),
             }
+            if msg.get("available") and not was_available:
+                self.notify_dispatch()
+            for change in msg.get("tier_changes") or []:
+                worker.model_tier_history.append(change)
+                logger.info("Worker %s model %s -> %s (%s, %.1fs)", worker.id,
+                            change.get("from"), change.get("to"), change.get("reason"),
+                            change.get("time_s", 0))
 
         elif msg_type == "job_progress":
             job_id = msg.get("job_id")
+            if job_id and msg.get("preview_glb_base64"):
+                await self._handle_preview(job_id, msg)
             if job_id:
                 # Update DB progress
                 await self._update_progress(
@@ -114,7 +453,7 @@ class WorkerBridge:
                     message=msg.get("message"),
                 )
                 # Fan out to clients
-                await self._fan_out(job_id, {
+                self._fan_out(job_id, {
                     "type": "progress",
                     "job_id": job_id,
                     "step": msg.get("step"),
@@ -122,80 +461,359 @@ class WorkerBridge:
                     "message": msg.get("message"),
                 })
 
+        elif msg_type == "artifact_begin":
+            await self._handle_artifact_begin(worker, msg)
+
+        elif msg_type == "artifact_end":
+            await self._handle_artifact_end(worker, msg)
+
         elif msg_type == "job_complete":
-            await self._handle_job_complete(msg)
+            job_id = msg.get("job_id")
+            if await self._owns_job(worker, job_id):
+                await self._handle_job_complete(msg)
+            else:
+                logger.warning("Ignoring job_complete for %s from worker %s: no longer its job",
+                               job_id, worker.id)
+                storage.delete_job_files(None, *self._drop_artifacts(job_id))
+            self._job_done(worker, job_id)
+
+        elif msg_type == "job_failed" and msg.get("step") == "queued":
+            # Declined (busy or paused) before any work: not the job's fault
+            job_id = msg.get("job_id")
+            worker.jobs.discard(job_id)
+            worker.gpu_status["available"] = False  # until its next heartbeat
+            logger.info("Worker %s declined job %s: %s", worker.id, job_id, msg.get("error"))
+            try:
+                if job_id:
+                    await self._requeue([job_id])
+            except Exception:
+                logger.exception("Failed to re-queue declined job %s", job_id)
+
+        elif msg_type == "job_failed" and msg.get("step") == "abandoned":
+            # Result refused (job cancelled, expired or reassigned): already settled
+            job_id = msg.get("job_id")
+            storage.delete_job_files(None, *self._drop_artifacts(job_id))
+            logger.info("Worker %s abandoned job %s", worker.id, job_id)
+            self._job_done(worker, job_id)
 
         elif msg_type == "job_failed":
             await self._handle_job_failed(msg)
+            self._job_done(worker, msg.get("job_id"))
 
         elif msg_type == "pong":
             pass  # Heartbeat response
 
         elif msg_type == "worker_bye":
-            logger.info("Worker sent bye: %s", msg.get("reason"))
+            logger.info("Worker %s sent bye: %s", worker.id, msg.get("reason"))
+
+    def _job_done(self, worker: ConnectedWorker, job_id: str | None) -> None:
+        """Release a worker's slot and wake the dispatcher.
+
+        The last heartbeat reported the GPU busy with this job; an idle
+        worker is available again now, not at its next heartbeat.
+        """
+        worker.jobs.discard(job_id)
+        if not worker.jobs and not worker.paused and not worker.draining:
+            worker.gpu_status["available"] = True
+        self._log_if_drained(worker)
+        self.notify_dispatch()
+
+    def _log_if_drained(self, worker: ConnectedWorker) -> None:
+        if worker.draining and not worker.jobs:
+            logger.info("Worker %s drained — safe to stop", worker.id)
+
+    # ─── Artifact streaming ────────────────────────────────────────
+
+    async def _handle_artifact_begin(self, worker: ConnectedWorker, msg: dict) -> None:
+        """Open (or resume) a transfer and tell the worker where to continue from."""
+        transfer_id, job_id, kind = msg.get("transfer_id"), msg.get("job_id"), msg.get("kind")
+        reply = {"type": "artifact_ack", "transfer_id": transfer_id}
+        if not transfer_id or not job_id or kind not in ARTIFACT_FILES:
+            await worker.ws.send_json({**reply, "error": "bad artifact_begin"})
+            return
+
+        if not await self._owns_job(worker, job_id):
+            # Cancelled, failed, expired or handed to another worker meanwhile
+            await worker.ws.send_json({**reply, "skip": True})
+            return
+
+        transfer = self._transfers.get(transfer_id)
+        if transfer is None:
+            transfer = ArtifactTransfer(transfer_id, job_id, kind, int(msg.get("size", 0)))
+            await asyncio.to_thread(transfer.recover)
+            self._transfers[transfer_id] = transfer
+        if transfer.file is None:
+            transfer.file = storage.open_partial_output(transfer.partial, transfer.offset)
+
+        if transfer.offset:
+            logger.info("Resuming %s upload for %s at %d/%d bytes",
+                        kind, job_id, transfer.offset, transfer.size)
+        await worker.ws.send_json({**reply, "offset": transfer.offset, "seq": transfer.seq})
+
+    async def _owns_job(self, worker: ConnectedWorker, job_id: str | None) -> bool:
+        """True if job_id is assigned to worker and still assigned/processing."""
+        if not job_id or job_id not in worker.jobs:
+            return False
+        async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
+            from models.job import Job, JobStatus
+
+            job = await session.get(Job, job_id)
+        return job is not None and job.status in (JobStatus.assigned, JobStatus.processing)
+
+    async def _handle_chunk(self, worker: ConnectedWorker, data: bytes) -> None:
+        """Append one binary frame to its transfer's partial file."""
+        if len(data) < CHUNK_HEADER.size:
+            return
+        raw_id, seq, offset = CHUNK_HEADER.unpack_from(data)
+        transfer = self._transfers.get(raw_id.hex())
+        if transfer is None or transfer.file is None:
+            logger.warning("Chunk for unknown transfer %s from worker %s", raw_id.hex(), worker.id)
+            return
+        if seq != transfer.seq or offset != transfer.offset:
+            # Stale frame from before a resume; artifact_end reports the real offset
+            logger.warning("Out-of-order chunk for %s (seq %d@%d, expected %d@%d)",
+                           transfer.id, seq, offset, transfer.seq, transfer.offset)
+            return
+        await asyncio.to_thread(transfer.write, memoryview(data)[CHUNK_HEADER.size:])
+
+    async def _handle_artifact_end(self, worker: ConnectedWorker, msg: dict) -> None:
+        """Verify size and SHA-256, then move the artifact into place."""
+        transfer_id = msg.get("transfer_id")
+        reply = {"type": "artifact_done", "transfer_id": transfer_id}
+        transfer = self._transfers.get(transfer_id)
+        if transfer is None:
+            await worker.ws.send_json({**reply, "ok": False, "offset": 0, "seq": 0,
+                                       "error": "unknown transfer"})
+            return
+
+        if transfer.offset != transfer.size:
+            await worker.ws.send_json({**reply, "ok": False, "offset": transfer.offset,
+                                       "seq": transfer.seq, "error": "short"})
+            return
+        if transfer.sha256.hexdigest() != msg.get("sha256"):
+            logger.warning("SHA-256 mismatch on %s for %s, restarting", transfer.kind,
+                           transfer.job_id)
+            await asyncio.to_thread(transfer.reset)
+            await worker.ws.send_json({**reply, "ok": False, "offset": 0, "seq": 0,
+                                       "error": "sha256 mismatch"})
+            return
+
+        transfer.close()
+        await asyncio.to_thread(storage.finalize_output, transfer.partial, transfer.rel)
+        del self._transfers[transfer_id]
+        self._received.setdefault(transfer.job_id, {})[transfer.kind] = transfer.rel
+        logger.info("Received %s for %s (%d bytes)", transfer.kind, transfer.job_id,
+                    transfer.size)
+        await worker.ws.send_json({**reply, "ok": True})
+
+    def _drop_artifacts(self, job_id: str) -> list[str]:
+        """Forget a job's transfers, deleting partials; returns finished artifact paths."""
+        for transfer in [t for t in self._transfers.values() if t.job_id == job_id]:
+            transfer.close()
+            storage.delete_job_files(None, transfer.partial)
+            del self._transfers[transfer.id]
+        return list(self._received.pop(job_id, {}).values())
 
     # ─── Job lifecycle ─────────────────────────────────────────────
 
+    def _pick_worker(self) -> ConnectedWorker | None:
+        """Least-loaded eligible worker, or None."""
+        if self.paused:
+            return None
+        eligible = [w for w in self.workers.values() if w.eligible]
+        return min(eligible, key=ConnectedWorker.load_key) if eligible else None
+
+    def notify_dispatch(self) -> None:
+        """Wake the dispatcher: a job may be pending, or a worker may be free."""
+        self._dispatch_wake.set()
+
     async def _dispatch_loop(self) -> None:
-        """Periodically check for pending jobs and dispatch to the worker."""
+        """
+        Hand pending jobs to the least-loaded eligible workers.
+
+        Sleeps until notify_dispatch() — upload, retry, re-queue, job
+        finished, worker free / resumed, or a Postgres NOTIFY from another
+        process — with a slow sweep every dispatch_sweep_interval_s in
+        case a wake-up was missed.
+        """
         while True:
             try:
-                await asyncio.sleep(2)
-                if not self.worker_ws or self.paused:
-                    continue
-                if self.gpu_status and not self.gpu_status.get("available", True):
-                    continue
+                try:
+                    await asyncio.wait_for(self._dispatch_wake.wait(),
+                                           settings.dispatch_sweep_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+                self._dispatch_wake.clear()
+                while (worker := self._pick_worker()) is not None:
+                    if not await self._dispatch_one(worker):
+                        break
 
-                async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
-                    job = await queue.get_next_pending(session)
-                    if not job:
-                        continue
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                logger.exception("Error in dispatch loop")
+                await asyncio.sleep(5)
 
-                    # Read image file and send to worker
-                    upload_file = storage.get_upload_path(job.upload_path)
-                    if not upload_file.exists():
-                        await queue.mark_failed(
-                            session, job.id, error="Upload file missing", step="queued"
-                        )
-                        continue
+    async def _dispatch_one(self, worker: ConnectedWorker) -> bool:
+        """Claim the next pending job for worker. False when the queue is empty."""
+        async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
+            job = await queue.get_next_pending(session)
+            if not job:
+                return False
+
+            # The worker fetches the image itself over a signed URL
+            upload_file = storage.get_upload_path(job.upload_path)
+            if not upload_file.exists():
+                await queue.mark_failed(
+                    session, job.id, error="Upload file missing", step="queued"
+                )
+                return True
 
-                    image_data = upload_file.read_bytes()
-                    image_b64 = base64.b64encode(image_data).decode()
+            hint = await queue.queue_hint(session)
 
-                    await self.worker_ws.send_json({
-                        "type": "job_assign",
-                        "job_id": job.id,
-                        "image_filename": job.original_filename,
-                        "image_base64": image_b64,
-                        "settings": job.settings,
-                    })
-                    logger.info("Dispatched job %s to worker", job.id)
+            worker.jobs.add(job.id)
+            try:
+                await worker.ws.send_json({
+                    "type": "job_assign",
+                    "job_id": job.id,
+                    "image_filename": job.original_filename,
+                    "image_url": signed_url.sign(f"/api/worker/input/{job.id}"),
+                    "image_sha256": job.image_hash,
+                    "image_size": upload_file.stat().st_size,
+                    "settings": job.settings,
+                    "queue_hint": hint,
+                })
+            except Exception:
+                # Connection is going away; its cleanup re-queues the job
+                logger.warning("Dispatch of job %s to worker %s failed", job.id, worker.id)
+                return False
+            self.snapshots.invalidate(job.id)
+            self.snapshots.invalidate_pending()
+            self._fan_out(job.id, {"type": "status", "job_id": job.id, "status": "assigned",
+                                   "step": None, "progress_pct": 0, "message": None})
+            logger.info("Dispatched job %s to worker %s", job.id, worker.id)
+            return True
+
+    async def _listen_loop(self) -> None:
+        """Postgres only: LISTEN for pending-job NOTIFYs from any server process."""
+        while True:
+            try:
+                async with engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    pg = raw.driver_connection  # asyncpg connection
+                    lost = asyncio.Event()
+
+                    def on_notify(*_):
+                        self.notify_dispatch()
+
+                    def on_lost(_):
+                        lost.set()
+
+                    pg.add_termination_listener(on_lost)
+                    await pg.add_listener(queue.PENDING_CHANNEL, on_notify)
+                    logger.info("Listening on %s", queue.PENDING_CHANNEL)
+                    try:
+                        await lost.wait()
+                    finally:
+                        pg.remove_termination_listener(on_lost)
+                        if not pg.is_closed():
+                            await pg.remove_listener(queue.PENDING_CHANNEL, on_notify)
+                logger.warning("LISTEN connection lost, reconnecting")
+                self.notify_dispatch()  # may have missed a NOTIFY meanwhile
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                logger.exception("Error in LISTEN loop")
+                await asyncio.sleep(5)
 
+    async def _queue_hint_loop(self) -> None:
+        """Tell the workers how much work is waiting, so they keep the model loaded."""
+        while True:
+            try:
+                await asyncio.sleep(settings.queue_hint_interval_s)
+                if not self.workers:
+                    continue
+                async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
+                    hint = await queue.queue_hint(session)
+                for worker in list(self.workers.values()):
+                    try:
+                        await worker.ws.send_json({"type": "queue_hint", **hint})
+                    except Exception:
+                        pass  # Disconnect is handled by that worker's loop
             except asyncio.CancelledError:
                 break
             except Exception:
-                logger.exception("Error in dispatch loop")
+                logger.exception("Error in queue hint loop")
                 await asyncio.sleep(5)
 
     async def _update_progress(
         self, job_id: str, step: str | None, pct: int, message: str | None
     ) -> None:
+        """Record live progress; persist on a step change, else at most every
+        progress_flush_interval_s."""
+        live = self._progress.get(job_id)
+        self._progress[job_id] = {"step": step, "progress_pct": pct, "message": message}
+        self.snapshots.patch(job_id, status="processing", current_step=step,
+                             progress_pct=pct, progress_message=message)
+        if live is None or live["step"] != step:
+            await self._flush_progress([job_id])
+            return
+        self._progress_dirty.add(job_id)
+        if not self._flush_pending:
+            self._flush_pending = True
+            self._spawn(self._flush_progress_later())
+
+    async def _flush_progress_later(self) -> None:
+        await asyncio.sleep(settings.progress_flush_interval_s)
+        self._flush_pending = False
+        await self._flush_progress(list(self._progress_dirty))
+
+    async def _flush_progress(self, job_ids: list[str]) -> None:
+        """Write the live progress of job_ids in one transaction."""
+        self._progress_dirty.difference_update(job_ids)
+        job_ids = [j for j in job_ids if j in self._progress]
+        if not job_ids:
+            return
         try:
             async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
                 from sqlalchemy import select
                 from models.job import Job, JobStatus
 
-                result = await session.execute(select(Job).where(Job.id == job_id))
-                job = result.scalar_one_or_none()
-                if job:
-                    if job.status == JobStatus.assigned:
-                        job.status = JobStatus.processing
-                    job.current_step = step
-                    job.progress_pct = pct
-                    job.progress_message = message
-                    await session.commit()
+                result = await session.execute(select(Job).where(Job.id.in_(job_ids)))
+                for job in result.scalars():
+                    live = self._progress.get(job.id)
+                    if not live or job.status not in (JobStatus.assigned, JobStatus.processing):
+                        continue
+                    job.status = JobStatus.processing
+                    job.current_step = live["step"]
+                    job.progress_pct = live["progress_pct"]
+                    job.progress_message = live["message"]
+                await session.commit()
+        except Exception:
+            logger.exception("Failed to update progress for %s", ", ".join(job_ids))
+
+    def _forget_progress(self, job_id: str) -> None:
+        """Drop live progress once the job's final state is in the DB."""
+        self._progress.pop(job_id, None)
+        self._progress_dirty.discard(job_id)
+
+    async def _handle_preview(self, job_id: str, msg: dict) -> None:
+        """Store a coarse preview mesh and point subscribers at it."""
+        try:
+            storage.save_output(base64.b64decode(msg["preview_glb_base64"]),
+                                storage.preview_mesh_rel(job_id))
         except Exception:
-            logger.exception("Failed to update progress for %s", job_id)
+            logger.exception("Failed to save preview mesh for %s", job_id)
+            return
+        self._fan_out(job_id, {
+            "type": "preview",
+            "job_id": job_id,
+            "glb_url": f"/api/job/{job_id}/preview_mesh",
+            "face_count": msg.get("preview_face_count"),
+        })
+
+    def _discard_preview(self, job_id: str) -> None:
+        storage.delete_job_files(None, storage.preview_mesh_rel(job_id))
 
     async def _handle_job_complete(self, msg: dict) -> None:
         job_id = msg.get("job_id")
@@ -203,21 +821,20 @@ class WorkerBridge:
             return
 
         try:
-            # Save STL file
-            stl_b64 = msg.get("stl_base64")
-            stl_rel = None
-            if stl_b64:
-                stl_data = base64.b64decode(stl_b64)
-                stl_rel = f"{job_id}/model.stl"
-                storage.save_output(stl_data, stl_rel)
-
-            # Save GLB file (optional)
-            glb_b64 = msg.get("glb_base64")
-            glb_rel = None
-            if glb_b64:
-                glb_data = base64.b64decode(glb_b64)
-                glb_rel = f"{job_id}/model.glb"
-                storage.save_output(glb_data, glb_rel)
+            # Artifacts arrive beforehand as chunked uploads; older workers
+            # still inline them as base64 fields
+            received = self._received.get(job_id, {})
+            self._drop_artifacts(job_id)
+            self._forget_progress(job_id)
+            paths = {}
+            for kind, filename in ARTIFACT_FILES.items():
+                inline = msg.get(f"{kind}_base64")
+                if inline:
+                    paths[kind] = f"{job_id}/{filename}"
+                    storage.save_output(base64.b64decode(inline), paths[kind])
+                else:
+                    paths[kind] = received.get(kind)
+            stl_rel, glb_rel, web_glb_rel = paths["stl"], paths["glb"], paths["web_glb"]
 
             # Update DB
             async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
@@ -226,11 +843,14 @@ class WorkerBridge:
                     job_id,
                     stl_path=stl_rel,
                     glb_path=glb_rel,
+                    web_glb_path=web_glb_rel,
                     vertex_count=msg.get("vertex_count", 0),
                     face_count=msg.get("face_count", 0),
                     is_watertight=msg.get("is_watertight", False),
                     generation_time_s=msg.get("generation_time_s", 0),
+                    mesh_stats=msg.get("mesh_stats"),
                     gpu_metrics=msg.get("gpu_metrics"),
+                    spans=msg.get("spans"),
                 )
 
                 # Audit log
@@ -239,21 +859,88 @@ class WorkerBridge:
                     detail=f"vertices={msg.get('vertex_count')}"
                 ))
                 await session.commit()
+            self.snapshots.invalidate(job_id)
+
+            # The full-resolution result supersedes the coarse preview
+            self._discard_preview(job_id)
 
             # Notify clients
-            await self._fan_out(job_id, {
+            self._fan_out(job_id, {
                 "type": "complete",
                 "job_id": job_id,
                 "vertex_count": msg.get("vertex_count"),
                 "face_count": msg.get("face_count"),
                 "is_watertight": msg.get("is_watertight"),
+                "mesh_stats": msg.get("mesh_stats"),
                 "generation_time_s": msg.get("generation_time_s"),
             })
             logger.info("Job %s complete (%d vertices)", job_id, msg.get("vertex_count", 0))
 
+            mesh_rel = web_glb_rel or glb_rel or stl_rel
+            if settings.preview_render_enabled and mesh_rel:
+                self._start_render(job_id, mesh_rel)
+
         except Exception:
             logger.exception("Error handling job_complete for %s", job_id)
 
+    def ensure_previews(self, job) -> None:
+        """Give a cache-hit job previews if its source has none yet.
+
+        A render already in flight for the source is shared on completion;
+        otherwise the source's mesh is rendered now.
+        """
+        if job.preview_path or not job.cached_from or not settings.preview_render_enabled:
+            return
+        mesh_rel = job.web_glb_path or job.glb_path or job.stl_path
+        if mesh_rel:
+            self._start_render(job.cached_from, mesh_rel)
+
+    def _start_render(self, job_id: str, mesh_rel: str) -> None:
+        if job_id not in self._rendering:
+            self._rendering.add(job_id)
+            self._spawn(self._render_previews(job_id, mesh_rel))
+
+    async def _render_previews(self, job_id: str, mesh_rel: str) -> None:
+        """Render the preview still and turntable off the event loop, then record them.
+
+        Cache hits linked to job_id without previews get the same files.
+        """
+        still_rel = f"{job_id}/preview.webp"
+        turntable_rel = f"{job_id}/turntable.webp"
+        try:
+            started = time.perf_counter()
+            await asyncio.to_thread(
+                renderer.render_job_previews,
+                storage.get_output_path(mesh_rel),
+                storage.get_output_path(still_rel),
+                storage.get_output_path(turntable_rel),
+            )
+
+            async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
+                from sqlalchemy import select
+                from models.job import Job
+
+                job = await session.get(Job, job_id)
+                result = await session.execute(
+                    select(Job).where(Job.cached_from == job_id, Job.preview_path.is_(None))
+                )
+                targets = ([job] if job is not None else []) + list(result.scalars().all())
+                if not targets:  # Deleted while rendering
+                    storage.delete_job_files(None, still_rel, turntable_rel)
+                    return
+                for target in targets:
+                    target.preview_path = still_rel
+                    target.turntable_path = turntable_rel
+                await session.commit()
+            for target in targets:
+                self.snapshots.invalidate(target.id)
+
+            logger.info("Rendered previews for %s in %.1fs", job_id, time.perf_counter() - started)
+        except Exception:
+            logger.exception("Preview render failed for %s", job_id)
+        finally:
+            self._rendering.discard(job_id)
+
     async def _handle_job_failed(self, msg: dict) -> None:
         job_id = msg.get("job_id")
         if not job_id:
@@ -263,14 +950,18 @@ class WorkerBridge:
         step = msg.get("step")
 
         try:
+            storage.delete_job_files(None, *self._drop_artifacts(job_id))
+            self._forget_progress(job_id)
             async with SQLModelAsyncSession(engine, expire_on_commit=False) as session:
                 await queue.mark_failed(session, job_id, error=error, step=step)
                 session.add(AuditLog(
                     action="job_failed", job_id=job_id, detail=error
                 ))
                 await session.commit()
+            self.snapshots.invalidate(job_id)
+            self._discard_preview(job_id)
 
-            await self._fan_out(job_id, {
+            self._fan_out(job_id, {
                 "type": "failed",
                 "job_id": job_id,
                 "error": error,
@@ -283,18 +974,33 @@ class WorkerBridge:
 
     # ─── Admin commands ────────────────────────────────────────────
 
-    async def send_command(self, action: str, job_id: str | None = None) -> bool:
-        """Send a command to the worker. Returns True if sent."""
-        if not self.worker_ws:
-            return False
+    def get_worker(self, worker_id: str) -> ConnectedWorker | None:
+        return self.workers.get(worker_id)
+
+    async def send_command(
+        self, action: str, job_id: str | None = None, worker_id: str | None = None
+    ) -> bool:
+        """Send a command to one worker, or all of them. Returns True if any got it."""
+        targets = ([self.workers[worker_id]] if worker_id in self.workers
+                   else [] if worker_id else list(self.workers.values()))
         msg = {"type": "command", "action": action}
         if job_id:
             msg["job_id"] = job_id
-        await self.worker_ws.send_json(msg)
-        return True
+        sent = False
+        for worker in targets:
+            try:
+                await worker.ws.send_json(msg)
+                sent = True
+            except Exception:
+                logger.warning("Command %s to worker %s failed", action, worker.id)
+        return sent
 
     async def send_ping(self) -> bool:
-        if not self.worker_ws:
-            return False
-        await self.worker_ws.send_json({"type": "ping"})
-        return True
+        sent = False
+        for worker in list(self.workers.values()):
+            try:
+                await worker.ws.send_json({"type": "ping"})
+                sent = True
+            except Exception:
+                pass
+        return sent
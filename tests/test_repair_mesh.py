@@ -0,0 +1,42 @@
+"""repair_mesh on inverted meshes (CPU only; img2stl needs torch to import)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip("torch")
+trimesh = pytest.importorskip("trimesh")
+
+import img2stl  # noqa: E402
+
+
+def _ran(report: dict) -> list[str]:
+    return [s['stage'] for s in report['stages'][1:] if s['ran']]
+
+
+def test_inverted_open_mesh_comes_out_outward():
+    # Consistently wound but inside-out, with one face missing: the
+    # pre-repair inside-out check can't run until fill_holes closes it
+    sphere = trimesh.creation.icosphere(subdivisions=2)
+    mesh = trimesh.Trimesh(sphere.vertices, sphere.faces[1:][:, ::-1], process=False)
+    report = {}
+
+    out = img2stl.repair_mesh(mesh, report=report)
+
+    assert out.is_watertight
+    assert out.volume > 0
+    assert 'fix_inversion' in _ran(report)
+
+
+def test_inverted_closed_mesh_fixed_before_fill():
+    sphere = trimesh.creation.icosphere(subdivisions=2)
+    mesh = trimesh.Trimesh(sphere.vertices, sphere.faces[:, ::-1], process=False)
+    report = {}
+
+    out = img2stl.repair_mesh(mesh, report=report)
+
+    assert out.volume > 0
+    assert _ran(report) == ['fix_normals']
@@ -14,6 +14,7 @@ _PROJECT_DIR = _WORKER_DIR.parent
 # Connection — set via env vars
 VPS_WS_URL = os.environ.get("VPS_WS_URL", "ws://localhost:8080/ws/worker")
 AUTH_TOKEN = os.environ.get("WORKER_AUTH_TOKEN", "")
+VPS_HTTP_URL = os.environ.get("VPS_HTTP_URL", "")  # Input downloads; default: derived from the WS URL
 
 # GPU thresholds
 MIN_FREE_VRAM_GB = 4.0        # Enough to load + run Hunyuan3D (model uses ~8GB, WSL reserves some)
@@ -30,12 +31,39 @@ DEFAULT_GUIDANCE = 5.0
 DEFAULT_OCTREE_RES = 384
 DEFAULT_HEIGHT_MM = 100.0
 DEFAULT_SEED = 42
+DEFAULT_MIN_FRAGMENT_RATIO = 1.0   # Keep parts ≥ this × largest part (1.0 = largest only)
+DEFAULT_TARGET_FACES = 0           # Face budget after post-processing (0 = keep all)
+DEFAULT_DECIMATE_TOLERANCE = None  # Max deviation as fraction of bbox diagonal
+DEFAULT_WELD_TOLERANCE = 1e-6      # Vertex weld distance as fraction of bbox diagonal (0 = off)
+WEB_PREVIEW_FACES = 100_000        # Face budget of the compact GLB the browser viewer loads
+PREVIEW_OCTREE_RES = 128           # Coarse early mesh sent while full res decodes (0 = off)
+
+# VRAM budget — pick the largest octree_res that fits, retry lower on OOM
+VRAM_AUTO_TIER = True
+OCTREE_TIERS = (384, 320, 256, 192, 128)
+VRAM_PRIOR_COEF = (600.0, 2800.0, 100.0)  # MB: base, per (res/384)^3, per (steps/50)
+VRAM_SAFETY_MB = 512
+VRAM_CALIBRATION_PATH = str(_WORKER_DIR / "vram_calibration.json")
 
 # WebSocket
 WS_MAX_SIZE = 100 * 1024 * 1024  # 100MB — STLs can be 30-50MB, base64 adds ~33%
 
-# Model lifecycle
-MODEL_IDLE_TIMEOUT_S = 120  # Unload model from VRAM after 2 min idle
+# Input download — streamed to disk over a signed URL, checked against its SHA-256
+INPUT_FETCH_RETRIES = 3
+INPUT_FETCH_TIMEOUT_S = 30
+
+# Result upload — artifacts stream as binary frames, resumable across reconnects
+ARTIFACT_CHUNK_BYTES = 1024 * 1024
+ARTIFACT_MAX_RETRIES = 5
+ARTIFACT_REPLY_TIMEOUT_S = 60   # Wait this long for the server's ack / done
+ARTIFACT_RESUME_WAIT_S = 120    # Wait this long for a reconnect (server holds the job as long)
+
+# Model lifecycle — hot (VRAM) → warm (pinned host RAM) → cold (unloaded)
+MODEL_HOT_IDLE_S = 5         # Park weights in host RAM this long after a job (frees VRAM)
+MODEL_WARM_IDLE_S = 30 * 60  # Unload entirely after this long warm
+WARM_MIN_FREE_RAM_GB = 4.0   # Go cold instead of warm / drop warm below this much free host RAM
+KEEP_HOT_ARRIVAL_S = 60      # Stay hot while the server predicts a job within this long
+QUEUE_HINT_MAX_AGE_S = 60    # Ignore queue hints older than this (server gone quiet)
 
 # Worker
 WORKER_VERSION = "1.0.0"
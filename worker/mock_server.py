@@ -21,7 +21,7 @@ Interactive commands (type while running):
 
 import asyncio
 import argparse
-import base64
+import hashlib
 import json
 import logging
 import os
@@ -31,8 +31,11 @@ import uuid
 from pathlib import Path
 
 import websockets
+from websockets.datastructures import Headers
+from websockets.http11 import Response
 
 import config
+from worker import CHUNK_HEADER
 
 logging.basicConfig(
     format='%(asctime)s %(levelname)-7s %(message)s',
@@ -44,6 +47,10 @@ logger = logging.getLogger('mock_server')
 # Global state
 connected_worker = None
 worker_info = {}
+transfers = {}  # transfer_id hex -> {kind, size, offset, seq, sha256, file}
+inputs = {}  # job_id -> image bytes, served at /input/<job_id>
+
+ARTIFACT_NAMES = {'stl': 'output.stl', 'glb': 'output.glb', 'web_glb': 'output.web.glb'}
 
 
 def fmt_size(nbytes: int) -> str:
@@ -60,10 +67,14 @@ def make_job_message(image_path: str, settings: dict = None) -> dict:
     with open(image_path, 'rb') as f:
         image_data = f.read()
 
+    job_id = str(uuid.uuid4())
+    inputs[job_id] = image_data
     return {
         "type": "job_assign",
-        "job_id": str(uuid.uuid4()),
-        "image_base64": base64.b64encode(image_data).decode('ascii'),
+        "job_id": job_id,
+        "image_url": f"/input/{job_id}",
+        "image_sha256": hashlib.sha256(image_data).hexdigest(),
+        "image_size": len(image_data),
         "image_filename": Path(image_path).name,
         "settings": settings or {
             "steps": config.DEFAULT_STEPS,
@@ -74,6 +85,17 @@ def make_job_message(image_path: str, settings: dict = None) -> dict:
     }
 
 
+def serve_input(connection, request):
+    """Plain HTTP GET /input/<job_id> on the WebSocket port; anything else upgrades."""
+    if not request.path.startswith('/input/'):
+        return None
+    data = inputs.get(request.path.removeprefix('/input/'))
+    if data is None:
+        return connection.respond(404, "Not found\n")
+    return Response(200, "OK", Headers({"Content-Type": "application/octet-stream",
+                                        "Content-Length": str(len(data))}), data)
+
+
 async def handle_worker(websocket):
     """Handle a single worker connection."""
     global connected_worker, worker_info
@@ -97,6 +119,9 @@ async def handle_worker(websocket):
 
     try:
         async for raw in websocket:
+            if isinstance(raw, bytes):
+                handle_chunk(raw)
+                continue
             msg = json.loads(raw)
             await handle_message(websocket, msg)
     except websockets.ConnectionClosed:
@@ -106,6 +131,20 @@ async def handle_worker(websocket):
         worker_info = {}
 
 
+def handle_chunk(data: bytes):
+    """Append a binary artifact frame to its transfer's file."""
+    raw_id, seq, offset = CHUNK_HEADER.unpack_from(data)
+    t = transfers.get(raw_id.hex())
+    if t is None or seq != t['seq'] or offset != t['offset']:
+        logger.warning(f"  Dropped chunk seq={seq} offset={offset}")
+        return
+    payload = data[CHUNK_HEADER.size:]
+    t['file'].write(payload)
+    t['sha256'].update(payload)
+    t['offset'] += len(payload)
+    t['seq'] += 1
+
+
 async def handle_message(ws, msg: dict):
     """Process a message from the worker."""
     t = msg.get("type")
@@ -124,10 +163,17 @@ async def handle_message(ws, msg: dict):
             f"{msg.get('utilization_pct', 0)}% util, "
             f"{msg.get('temp_c', 0)}C, "
             f"available={msg.get('available')}, "
-            f"model_loaded={msg.get('model_loaded')}"
+            f"model={msg.get('model_tier')}"
         )
+        for change in msg.get('tier_changes') or []:
+            logger.info(f"    Model {change['from']} → {change['to']} "
+                        f"({change['reason']}, {change['time_s']:.1f}s)")
 
     elif t == "job_progress":
+        if msg.get('preview_glb_base64'):
+            logger.info(
+                f"  PREVIEW: {msg.get('preview_face_count', 0):,} faces, "
+                f"{len(msg['preview_glb_base64']) * 3 // 4 / 1e6:.1f}MB GLB")
         bar_len = 30
         pct = msg.get('progress_pct', 0)
         filled = int(bar_len * pct / 100)
@@ -148,6 +194,14 @@ async def handle_message(ws, msg: dict):
             f"    Watertight: {msg.get('is_watertight')}")
         logger.info(
             f"    Time: {msg.get('generation_time_s', 0):.1f}s")
+        stats = msg.get('mesh_stats')
+        if stats:
+            logger.info(
+                f"    Stats: {stats['components']} component(s), "
+                f"{stats['boundary_edges']:,} boundary edges, "
+                f"Euler {stats['euler_number']}, volume {stats['volume']:.1f}mm3")
+        for span in msg.get('spans') or []:
+            logger.info(f"      {span['stage']:<12} {span['duration_s']:>7.2f}s")
 
         metrics = msg.get('gpu_metrics', {})
         if metrics:
@@ -157,25 +211,31 @@ async def handle_message(ws, msg: dict):
                 f"{metrics.get('gpu_energy_j', 0)}J energy"
             )
 
-        # Save STL
-        stl_b64 = msg.get('stl_base64')
-        stl_name = msg.get('stl_filename', 'output.stl')
-        if stl_b64:
-            stl_data = base64.b64decode(stl_b64)
-            out_path = Path('.') / stl_name
-            with open(out_path, 'wb') as f:
-                f.write(stl_data)
-            logger.info(f"    STL saved: {out_path} ({fmt_size(len(stl_data))})")
-
-        # Save GLB
-        glb_b64 = msg.get('glb_base64')
-        glb_name = msg.get('glb_filename')
-        if glb_b64 and glb_name:
-            glb_data = base64.b64decode(glb_b64)
-            out_path = Path('.') / glb_name
-            with open(out_path, 'wb') as f:
-                f.write(glb_data)
-            logger.info(f"    GLB saved: {out_path} ({fmt_size(len(glb_data))})")
+        logger.info(f"    Artifacts: {', '.join(msg.get('artifacts') or [])}")
+
+    elif t == "artifact_begin":
+        tid = msg['transfer_id']
+        if tid not in transfers:
+            transfers[tid] = {
+                'kind': msg['kind'], 'size': msg['size'], 'offset': 0, 'seq': 0,
+                'sha256': hashlib.sha256(),
+                'file': open(Path('.') / ARTIFACT_NAMES[msg['kind']], 'wb'),
+            }
+        tr = transfers[tid]
+        await ws.send(json.dumps({"type": "artifact_ack", "transfer_id": tid,
+                                  "offset": tr['offset'], "seq": tr['seq']}))
+
+    elif t == "artifact_end":
+        tid = msg['transfer_id']
+        tr = transfers[tid]
+        ok = tr['offset'] == tr['size'] and tr['sha256'].hexdigest() == msg['sha256']
+        if ok:
+            tr['file'].close()
+            del transfers[tid]
+            logger.info(f"    {tr['kind'].upper()} saved: {ARTIFACT_NAMES[tr['kind']]} "
+                        f"({fmt_size(tr['size'])})")
+        await ws.send(json.dumps({"type": "artifact_done", "transfer_id": tid, "ok": ok,
+                                  "offset": tr['offset'], "seq": tr['seq']}))
 
     elif t == "job_failed":
         logger.error(
@@ -285,7 +345,8 @@ async def main(args):
         logger.info(f"Will auto-send: {args.test_image}")
 
     server = await websockets.serve(
-        handle_worker, host, port, max_size=config.WS_MAX_SIZE)
+        handle_worker, host, port, max_size=config.WS_MAX_SIZE,
+        process_request=serve_input)
 
     # Fire-and-forget the auto_job
     if args.test_image:
@@ -1,17 +1,28 @@
 """Wraps img2stl.py as a callable module with progress callbacks.
 
 Imports the core functions from img2stl.py directly (no subprocess).
-Manages the Hunyuan3D pipeline lifecycle — loads once, reuses across jobs.
+Manages the Hunyuan3D pipeline lifecycle across three tiers:
+
+    hot   weights in VRAM, ready to generate
+    warm  weights parked in pinned host RAM — back on the GPU in seconds
+    cold  unloaded — the next job pays the full ~90s load
+
+The worker's idle loop drives hot → warm → cold; load_model() brings the
+pipeline back to hot from either.
 """
 
 import os
 import sys
+import threading
 import time
 import logging
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Callable, Optional
 
 import config
+import gpu_monitor
+import vram_budget
 
 logger = logging.getLogger(__name__)
 
@@ -26,30 +37,113 @@ import img2stl
 
 # Module-level pipeline state
 _pipeline = None
+_tier = 'cold'
+_tier_lock = threading.Lock()  # job thread vs idle loop
+_tier_changes = []             # not yet reported in a heartbeat
+_last_reload = None            # {'from', 'time_s'} of the latest move to hot
+
+# Background removal session — lives for the whole worker process (it is
+# small and CPU-side, so it is kept across model unloads)
+_rembg_session = None
+_rembg_setup_s = 0.0     # one-off cost of creating the session
+_rembg_avg_s = None      # running mean of actual segmentation time
 
 
 def is_model_loaded() -> bool:
-    return _pipeline is not None
+    """True when the pipeline is hot (in VRAM)."""
+    return _tier == 'hot'
 
 
-def load_model():
-    """Load the Hunyuan3D pipeline into VRAM (once, reused for all jobs)."""
-    global _pipeline
-    if _pipeline is not None:
-        logger.info("Pipeline already loaded, skipping")
-        return
+def model_tier() -> str:
+    return _tier
 
-    logger.info("Loading Hunyuan3D 2.1 pipeline...")
-    t0 = time.time()
-    _pipeline = img2stl.load_pipeline()
-    elapsed = time.time() - t0
-    logger.info(f"Pipeline loaded in {elapsed:.1f}s")
+
+def last_reload() -> Optional[dict]:
+    return _last_reload
 
 
-def unload_model():
-    """Unload the pipeline to free VRAM and system RAM."""
+def drain_tier_changes() -> list:
+    """Tier changes since the last call, oldest first."""
+    with _tier_lock:
+        changes = _tier_changes[:]
+        del _tier_changes[:]
+    return changes
+
+
+def _set_tier(tier: str, reason: str, elapsed: float) -> None:
+    global _tier
+    _tier_changes.append({'from': _tier, 'to': tier, 'reason': reason,
+                          'time_s': round(elapsed, 2), 'at': time.time()})
+    logger.info(f"Model {_tier} → {tier} ({reason}) in {elapsed:.1f}s")
+    _tier = tier
+
+
+def host_ram_available_gb() -> Optional[float]:
+    """MemAvailable from /proc/meminfo, or None if it cannot be read."""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024 ** 2
+    except OSError:
+        pass
+    return None
+
+
+def load_model():
+    """Bring the pipeline to hot: unpark it if warm, load it if cold."""
+    global _pipeline, _last_reload
+    with _tier_lock:
+        if _tier == 'hot':
+            logger.info("Pipeline already loaded, skipping")
+            return
+
+        t0 = time.time()
+        source = _tier
+        if source == 'warm':
+            img2stl.unpark_pipeline(_pipeline)
+        else:
+            logger.info("Loading Hunyuan3D 2.1 pipeline...")
+            _pipeline = img2stl.load_pipeline()
+        elapsed = time.time() - t0
+        _last_reload = {'from': source, 'time_s': round(elapsed, 2)}
+        _set_tier('hot', f'load from {source}', elapsed)
+
+
+def park_model() -> bool:
+    """
+    Hot → warm: move the weights into pinned host RAM to free VRAM.
+
+    Goes straight to cold instead when parking would leave less than
+    WARM_MIN_FREE_RAM_GB of host RAM. Returns True if the model is warm.
+    """
+    with _tier_lock:
+        if _tier != 'hot':
+            return _tier == 'warm'
+        need_gb = img2stl.pipeline_bytes(_pipeline) / 1024 ** 3
+        avail_gb = host_ram_available_gb()
+        if avail_gb is not None and avail_gb - need_gb < config.WARM_MIN_FREE_RAM_GB:
+            reason = (f"only {avail_gb:.1f}GB host RAM for {need_gb:.1f}GB "
+                      f"of weights")
+            _unload_locked(reason)
+            return False
+
+        t0 = time.time()
+        img2stl.park_pipeline(_pipeline)
+        _set_tier('warm', 'idle', time.time() - t0)
+        return True
+
+
+def unload_model(reason: str = 'idle'):
+    """Unload the pipeline (from either tier) to free VRAM and system RAM."""
+    with _tier_lock:
+        _unload_locked(reason)
+
+
+def _unload_locked(reason: str):
     global _pipeline
     if _pipeline is not None:
+        t0 = time.time()
         del _pipeline
         _pipeline = None
 
@@ -69,23 +163,77 @@ def unload_model():
         except Exception:
             pass
 
+        _set_tier('cold', reason, time.time() - t0)
         logger.info("Pipeline unloaded, VRAM + system RAM freed")
 
 
+def _get_rembg_session():
+    """Return the shared rembg session, creating it on first use."""
+    global _rembg_session, _rembg_setup_s
+    if _rembg_session is None:
+        t0 = time.time()
+        _rembg_session = img2stl.new_rembg_session()
+        _rembg_setup_s = time.time() - t0
+        logger.info(f"rembg session created in {_rembg_setup_s:.1f}s")
+        return _rembg_session, False
+    return _rembg_session, True
+
+
+def _remove_background(image_path: str) -> tuple:
+    """
+    Background removal with the shared session.
+
+    Returns (image, info) where info has skipped/reason/time_s plus
+    time_saved_s — session setup avoided by reuse, and the average
+    segmentation time when the alpha check skipped rembg entirely.
+    """
+    global _rembg_avg_s
+    session, reused = _get_rembg_session()
+    info = {}
+    image = img2stl.remove_background(image_path, session=session, info=info)
+
+    saved = _rembg_setup_s if reused else 0.0
+    if info['skipped']:
+        saved += _rembg_avg_s or 0.0
+    elif _rembg_avg_s is None:
+        _rembg_avg_s = info['time_s']
+    else:
+        _rembg_avg_s = 0.8 * _rembg_avg_s + 0.2 * info['time_s']
+
+    info['session_reused'] = reused
+    info['time_saved_s'] = round(saved, 2)
+    logger.info(f"Background removal: {info['reason']} in {info['time_s']:.1f}s "
+                f"(saved ~{info['time_saved_s']:.1f}s)")
+    return image, info
+
+
 def get_vram_threshold() -> float:
     """
     Return the appropriate min-free-VRAM threshold.
 
     When the pipeline is already loaded (~7.4GB in VRAM), we only need a
-    small amount of headroom for generation overhead. When it's not loaded,
-    we need enough free VRAM for the full pipeline + generation.
+    small amount of headroom for generation overhead. When it's not loaded
+    (warm or cold), we need enough free VRAM for the full pipeline +
+    generation.
     """
-    if _pipeline is not None:
+    if _tier == 'hot':
         return config.MIN_FREE_VRAM_GB_LOADED
     return config.MIN_FREE_VRAM_GB
 
 
+@contextmanager
+def _span(spans: list, stage: str, t_start: float):
+    """Append {stage, start_s, duration_s} for the enclosed block to spans."""
+    t0 = time.time()
+    try:
+        yield
+    finally:
+        spans.append({'stage': stage, 'start_s': round(t0 - t_start, 3),
+                      'duration_s': round(time.time() - t0, 3)})
+
+
 ProgressCallback = Callable[[str, int, str], None]
+PreviewCallback = Callable[[str, int], None]  # fn(glb_path, face_count)
 
 
 def run_pipeline(
@@ -93,6 +241,7 @@ def run_pipeline(
     output_dir: str,
     progress_callback: ProgressCallback,
     settings: Optional[dict] = None,
+    preview_callback: Optional[PreviewCallback] = None,
 ) -> dict:
     """
     Run the full img2stl pipeline on a single image.
@@ -101,14 +250,32 @@ def run_pipeline(
         image_path: Path to the input image.
         output_dir: Directory for output files (STL, GLB).
         progress_callback: Called at each stage — fn(step, pct, message).
-        settings: Optional overrides for steps, guidance, octree_res, seed, height_mm.
+        settings: Optional overrides for steps, guidance, octree_res, seed,
+            height_mm, min_fragment_ratio, target_faces, decimate_tolerance,
+            preview_octree_res, web_preview_faces, weld_tolerance.
+        preview_callback: If given, called once with a coarse GLB of the
+            same generation (oriented and scaled like the final mesh)
+            before the full-resolution mesh is extracted.
 
     Returns:
         Dict with stl_path, glb_path, vertex_count, face_count,
-        is_watertight, generation_time_s.
+        raw_face_count, decimate_time_s, is_watertight, generation_time_s,
+        mesh_stats (img2stl.mesh_stats of the final mesh: extents, volume,
+        area, edge counts, components, Euler number),
+        repair (edge checks plus per-stage decisions and timings),
+        weld (vertices merged and faces dropped before post-processing),
+        rembg (skip decision, time spent and time saved), and the
+        octree_res/steps actually used with the requested values, the
+        VRAM plan, baseline VRAM and whether an OOM retry happened.
+        spans lists {stage, start_s, duration_s} for rembg, model_load,
+        diffusion, preview, extraction, weld, postprocess, decimate, repair,
+        stats, export_stl, export_glb and export_web_glb (stages that did not run
+        are absent). web_glb_path is the compact viewer GLB (decimated,
+        quantized, cache-ordered); web_glb has its face count and size.
 
     Raises:
-        RuntimeError: On CUDA OOM or other fatal pipeline errors.
+        RuntimeError: On CUDA OOM (after one retry at a lower tier) or
+            other fatal pipeline errors.
     """
     global _pipeline
 
@@ -118,67 +285,190 @@ def run_pipeline(
     octree_res = settings.get('octree_res', config.DEFAULT_OCTREE_RES)
     seed = settings.get('seed', config.DEFAULT_SEED)
     height_mm = settings.get('height_mm', config.DEFAULT_HEIGHT_MM)
+    min_fragment_ratio = settings.get('min_fragment_ratio',
+                                      config.DEFAULT_MIN_FRAGMENT_RATIO)
+    target_faces = settings.get('target_faces', config.DEFAULT_TARGET_FACES)
+    decimate_tolerance = settings.get('decimate_tolerance',
+                                      config.DEFAULT_DECIMATE_TOLERANCE)
+    preview_octree_res = settings.get('preview_octree_res',
+                                      config.PREVIEW_OCTREE_RES)
+    web_preview_faces = settings.get('web_preview_faces', config.WEB_PREVIEW_FACES)
+    weld_tolerance = settings.get('weld_tolerance', config.DEFAULT_WELD_TOLERANCE)
 
     stem = Path(image_path).stem
     stl_path = str(Path(output_dir) / f"{stem}.stl")
     glb_path = str(Path(output_dir) / f"{stem}.glb")
+    web_glb_path = str(Path(output_dir) / f"{stem}.web.glb")
 
     os.makedirs(output_dir, exist_ok=True)
     t_start = time.time()
+    spans = []
 
     # ── Step 1: Remove background ──
     progress_callback("removing_background", 10, "Removing background...")
-    image = img2stl.remove_background(image_path)
+    with _span(spans, 'rembg', t_start):
+        image, rembg_info = _remove_background(image_path)
+    if rembg_info['skipped']:
+        progress_callback("removing_background", 15,
+                          f"Background removal skipped ({rembg_info['reason']})")
 
     # ── Step 2: Load pipeline if needed ──
-    if _pipeline is None:
-        progress_callback("loading_model", 20,
-                          "Loading Hunyuan3D 2.1 (first job, ~90s)...")
-        load_model()
-
-    # ── Step 3: Generate mesh ──
-    progress_callback("generating_mesh", 30,
-                      f"Generating mesh (steps={steps}, octree_res={octree_res})...")
-    mesh = img2stl.generate_shape(
-        _pipeline, image,
-        steps=steps,
-        guidance=guidance,
-        octree_res=octree_res,
-        seed=seed,
-    )
-
-    if mesh is None:
-        raise RuntimeError(
-            "CUDA out of memory. Try reducing octree_res or steps.")
+    if _tier != 'hot':
+        if _tier == 'warm':
+            progress_callback("loading_model", 20, "Moving model back to GPU...")
+        else:
+            progress_callback("loading_model", 20,
+                              "Loading Hunyuan3D 2.1 (first job, ~90s)...")
+        with _span(spans, 'model_load', t_start):
+            load_model()
+
+    # ── Step 3: Generate mesh (coarse preview first, if wanted) ──
+    preview_sent = False  # once per job: an OOM retry must not send a second one
+
+    def on_preview(preview_mesh):
+        nonlocal preview_sent
+        preview_sent = True
+        t_prev = time.time()
+        preview_mesh = img2stl.postprocess_mesh(
+            preview_mesh, target_height_mm=height_mm,
+            min_fragment_ratio=min_fragment_ratio)
+        preview_path = str(Path(output_dir) / f"{stem}.preview.glb")
+        preview_mesh.export(preview_path)
+        logger.info(f"Preview mesh: {len(preview_mesh.faces):,} faces "
+                    f"in {time.time() - t_prev:.1f}s")
+        preview_callback(preview_path, len(preview_mesh.faces))
+        progress_callback("generating_mesh", 55,
+                          "Preview ready — extracting full resolution...")
+
+    # Fit the request to the VRAM that is actually free right now
+    requested = (octree_res, steps)
+    vram_plan = None
+    status = gpu_monitor.get_gpu_status()
+    baseline_mb = status['vram_used_gb'] * 1024 if status.get('available') else None
+    if config.VRAM_AUTO_TIER and status.get('available'):
+        vram_plan = vram_budget.choose(octree_res, steps, status['vram_free_gb'] * 1024)
+        octree_res, steps = vram_plan['octree_res'], vram_plan['steps']
+        if (octree_res, steps) != requested:
+            logger.info(f"VRAM plan: {requested} → ({octree_res}, {steps}), "
+                        f"~{vram_plan['predicted_mb']}MB of "
+                        f"{vram_plan['free_mb']}MB free")
+
+    oom_retry = False
+    while True:
+        want_preview = (preview_callback is not None and not preview_sent
+                        and 0 < preview_octree_res < octree_res)
+        progress_callback("generating_mesh", 30,
+                          f"Generating mesh (steps={steps}, octree_res={octree_res})...")
+        t_gen = time.time()
+        gen_timings = {}
+        mesh = img2stl.generate_shape(
+            _pipeline, image,
+            steps=steps,
+            guidance=guidance,
+            octree_res=octree_res,
+            seed=seed,
+            preview_callback=on_preview if want_preview else None,
+            preview_octree_res=preview_octree_res,
+            timings=gen_timings,
+        )
+        offset = t_gen - t_start
+        for stage in ('diffusion', 'preview', 'extraction'):
+            if f'{stage}_s' in gen_timings:
+                spans.append({'stage': stage, 'start_s': round(offset, 3),
+                              'duration_s': round(gen_timings[f'{stage}_s'], 3)})
+                offset += gen_timings[f'{stage}_s']
+        if mesh is not None:
+            break
+
+        # OOM: retry once at the next tier down
+        lower = vram_budget.lower_tier(octree_res)
+        if oom_retry or lower is None:
+            raise RuntimeError(
+                "CUDA out of memory. Try reducing octree_res or steps.")
+        logger.warning(f"OOM at octree_res={octree_res}, retrying at {lower}")
+        img2stl.clear_vram()
+        octree_res, oom_retry = lower, True
+        progress_callback("generating_mesh", 30,
+                          f"Out of GPU memory — retrying at octree_res={lower}...")
 
     progress_callback("generating_mesh", 70,
                       f"Mesh generated: {len(mesh.vertices):,} vertices, "
                       f"{len(mesh.faces):,} faces")
 
-    # ── Step 4: Post-process ──
+    # ── Step 4: Weld seams, then post-process ──
     progress_callback("repairing_mesh", 75,
-                      "Post-processing (orient, clean, scale)...")
-    mesh = img2stl.postprocess_mesh(mesh, target_height_mm=height_mm)
+                      "Post-processing (weld, orient, clean, scale)...")
+    weld_report = {}
+    with _span(spans, 'weld', t_start):
+        mesh = img2stl.weld_vertices(mesh, tolerance=weld_tolerance,
+                                     report=weld_report)
+    with _span(spans, 'postprocess', t_start):
+        mesh = img2stl.postprocess_mesh(mesh, target_height_mm=height_mm,
+                                        min_fragment_ratio=min_fragment_ratio)
+
+    # ── Step 4b: Decimate to face budget ──
+    raw_faces = len(mesh.faces)
+    decimate_time = 0.0
+    if target_faces or decimate_tolerance:
+        progress_callback("repairing_mesh", 80,
+                          f"Decimating {raw_faces:,} faces "
+                          f"(budget {target_faces or 'none'})...")
+        with _span(spans, 'decimate', t_start):
+            mesh = img2stl.decimate_mesh(mesh, target_faces=target_faces,
+                                         tolerance=decimate_tolerance)
+        decimate_time = spans[-1]['duration_s']
+        logger.info(f"Decimated {raw_faces:,} → {len(mesh.faces):,} faces "
+                    f"in {decimate_time:.1f}s")
 
     # ── Step 5: Repair ──
     progress_callback("repairing_mesh", 85, "Repairing mesh for printing...")
-    mesh = img2stl.repair_mesh(mesh)
+    repair_report = {}
+    with _span(spans, 'repair', t_start):
+        mesh = img2stl.repair_mesh(mesh, report=repair_report)
+    ran = [st['stage'] for st in repair_report['stages'][1:] if st['ran']]
+    logger.info(f"Repair stages run: {', '.join(ran) or 'none (already closed)'}")
+    with _span(spans, 'stats', t_start):
+        stats = img2stl.mesh_stats(mesh)
 
     # ── Step 6: Export ──
     progress_callback("exporting", 90, "Exporting STL...")
-    mesh.export(stl_path)
+    with _span(spans, 'export_stl', t_start):
+        img2stl.write_stl(mesh, stl_path)
 
     progress_callback("exporting", 95, "Exporting GLB...")
-    mesh.export(glb_path)
+    with _span(spans, 'export_glb', t_start):
+        mesh.export(glb_path)
+
+    progress_callback("exporting", 97, "Building web preview GLB...")
+    with _span(spans, 'export_web_glb', t_start):
+        web_glb = img2stl.write_preview_glb(mesh, web_glb_path,
+                                            target_faces=web_preview_faces)
+    logger.info(f"Web GLB: {web_glb['face_count']:,} faces, "
+                f"{web_glb['bytes'] / 1e6:.1f}MB")
 
     gen_time = time.time() - t_start
 
     result = {
         'stl_path': stl_path,
         'glb_path': glb_path,
-        'vertex_count': len(mesh.vertices),
-        'face_count': len(mesh.faces),
-        'is_watertight': mesh.is_watertight,
+        'web_glb_path': web_glb_path,
+        'web_glb': web_glb,
+        'vertex_count': stats['vertices'],
+        'face_count': stats['faces'],
+        'raw_face_count': raw_faces,
+        'decimate_time_s': round(decimate_time, 2),
+        'is_watertight': stats['watertight'],
+        'mesh_stats': stats,
+        'repair': repair_report,
+        'weld': weld_report,
+        'rembg': rembg_info,
+        'octree_res': octree_res,
+        'steps': steps,
+        'requested': {'octree_res': requested[0], 'steps': requested[1]},
+        'vram_plan': vram_plan,
+        'vram_baseline_mb': baseline_mb,
+        'oom_retry': oom_retry,
+        'spans': spans,
         'generation_time_s': round(gen_time, 1),
     }
 
@@ -0,0 +1,130 @@
+"""VRAM budget model for picking octree_res / steps before generation.
+
+Peak generation VRAM (on top of the loaded pipeline) is modelled as
+
+    extra_mb = a + b * (octree_res / 384)**3 + c * (steps / 50)
+
+The volume decode grows with the cube of the octree resolution; steps are
+included so the fit can show whether they matter. Coefficients start from
+config priors and are refined by a ridge fit on the peak_vram_mb that
+GPUSampler records for each finished job, kept in a small JSON file.
+"""
+
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+MAX_SAMPLES = 200
+MIN_STEPS = 20
+_PRIOR_WEIGHT = 2.0  # priors count as this many observations
+
+_lock = threading.Lock()
+_samples: list[dict] | None = None
+_coef: np.ndarray | None = None
+_margin_mb: float = config.VRAM_SAFETY_MB
+
+
+def _features(octree_res: int, steps: int) -> np.ndarray:
+    return np.array([1.0, (octree_res / 384) ** 3, steps / 50])
+
+
+def _load() -> list[dict]:
+    global _samples
+    if _samples is None:
+        try:
+            with open(config.VRAM_CALIBRATION_PATH) as f:
+                _samples = json.load(f)[-MAX_SAMPLES:]
+        except (OSError, ValueError):
+            _samples = []
+        _fit()
+    return _samples
+
+
+def _fit() -> None:
+    """Ridge regression toward the priors; margin from the residual spread."""
+    global _coef, _margin_mb
+    prior = np.array(config.VRAM_PRIOR_COEF, dtype=float)
+    if not _samples:
+        _coef, _margin_mb = prior, config.VRAM_SAFETY_MB
+        return
+
+    X = np.array([_features(s['octree_res'], s['steps']) for s in _samples])
+    y = np.array([s['extra_mb'] for s in _samples], dtype=float)
+    reg = _PRIOR_WEIGHT * np.eye(len(prior))
+    _coef = np.linalg.solve(X.T @ X + reg, X.T @ y + reg @ prior)
+
+    rms = float(np.sqrt(np.mean((X @ _coef - y) ** 2)))
+    _margin_mb = max(config.VRAM_SAFETY_MB, 2 * rms)
+
+
+def predict_mb(octree_res: int, steps: int) -> float:
+    """Predicted peak VRAM (MB) a generation adds on top of the loaded model."""
+    with _lock:
+        _load()
+        return float(_features(octree_res, steps) @ _coef)
+
+
+def choose(octree_res: int, steps: int, free_mb: float) -> dict:
+    """
+    Pick the largest tier that fits in free_mb, never above the request.
+
+    Resolution is lowered first; steps only drop (down to MIN_STEPS) when
+    even the smallest tier does not fit. Returns octree_res, steps,
+    predicted_mb, free_mb and fits.
+    """
+    with _lock:
+        _load()
+        margin = _margin_mb
+    tiers = [r for r in config.OCTREE_TIERS if r < octree_res]
+    for res in [octree_res] + tiers:
+        need = predict_mb(res, steps)
+        if need + margin <= free_mb:
+            break
+
+    s = steps
+    while need + margin > free_mb and s > MIN_STEPS:
+        s = max(MIN_STEPS, s - 10)
+        need = predict_mb(res, s)
+
+    return {
+        'octree_res': res,
+        'steps': s,
+        'predicted_mb': round(need),
+        'free_mb': round(free_mb),
+        'fits': need + margin <= free_mb,
+    }
+
+
+def lower_tier(octree_res: int) -> int | None:
+    """Next tier below octree_res, or None if already at the bottom."""
+    lower = [r for r in config.OCTREE_TIERS if r < octree_res]
+    return max(lower) if lower else None
+
+
+def record(octree_res: int, steps: int, baseline_mb: float, peak_mb: float) -> None:
+    """Add one finished job's measured peak and refit."""
+    extra = peak_mb - baseline_mb
+    if extra <= 0:
+        return  # Sampler missed the peak (too short a job)
+    with _lock:
+        samples = _load()
+        samples.append({'octree_res': octree_res, 'steps': steps,
+                        'extra_mb': round(extra)})
+        del samples[:-MAX_SAMPLES]
+        _fit()
+        try:
+            tmp = config.VRAM_CALIBRATION_PATH + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(samples, f)
+            os.replace(tmp, config.VRAM_CALIBRATION_PATH)
+        except OSError as e:
+            logger.warning(f"Could not save VRAM calibration: {e}")
+    logger.info(f"VRAM sample: res={octree_res} steps={steps} "
+                f"extra={extra:.0f}MB (n={len(samples)})")
@@ -8,15 +8,21 @@ Usage:
 
 import asyncio
 import base64
+import hashlib
 import json
 import logging
 import logging.handlers
 import os
 import shutil
 import signal
+import socket
+import struct
 import sys
 import time
+import urllib.request
+import uuid
 from pathlib import Path
+from urllib.parse import urljoin, urlsplit
 
 import websockets
 
@@ -26,6 +32,9 @@ import gpu_sampler as gpu_sampler_mod
 
 logger = logging.getLogger('worker')
 
+# Binary artifact frame header: transfer id, seq, byte offset (matches the server)
+CHUNK_HEADER = struct.Struct("!16sIQ")
+
 
 def setup_logging():
     """Configure logging to stdout + rotating file."""
@@ -65,7 +74,13 @@ class Worker:
         self.should_stop = False
         self.reconnect_delay = config.RECONNECT_BASE_S
         self.force_next = False  # skip GPU check for next job
-        self.last_job_finished = None  # timestamp for idle unload
+        self.last_job_finished = None  # timestamp for idle park/unload
+        self.queue_hint = None  # latest {pending, next_arrival_s} from the server
+        self.queue_hint_at = 0.0
+
+        self._connected = asyncio.Event()  # set while a connection is up
+        self._replies: dict[str, asyncio.Future] = {}  # transfer_id -> ack/done
+        self._jobs: set[asyncio.Task] = set()  # jobs outlive a dropped connection
 
         os.makedirs(config.TEMP_DIR, exist_ok=True)
 
@@ -118,6 +133,7 @@ class Worker:
                                       additional_headers=headers,
                                       max_size=config.WS_MAX_SIZE) as ws:
             self.ws = ws
+            self._connected.set()
             self.reconnect_delay = config.RECONNECT_BASE_S
             logger.info(f"Connected to {self.url}")
 
@@ -128,6 +144,8 @@ class Worker:
                 "gpu_name": status.get('gpu_name', 'Unknown'),
                 "vram_total_gb": status.get('vram_total_gb', 0),
                 "worker_version": config.WORKER_VERSION,
+                "hostname": socket.gethostname(),
+                "current_job_id": self.current_job_id,  # still running across a reconnect
             })
 
             # Start heartbeat and idle unloader in background
@@ -142,6 +160,10 @@ class Worker:
                     if self.should_stop and not self.current_job_id:
                         break
             finally:
+                self._connected.clear()
+                for fut in self._replies.values():
+                    if not fut.done():
+                        fut.set_exception(ConnectionError("connection lost"))
                 heartbeat.cancel()
                 idle_unloader.cancel()
                 for task in (heartbeat, idle_unloader):
@@ -160,13 +182,27 @@ class Worker:
         t = msg.get("type")
 
         if t == "welcome":
-            logger.info(f"Server: {msg.get('message', 'connected')}")
+            logger.info(f"Server: {msg.get('message', 'connected')} "
+                        f"(worker id {msg.get('worker_id', '?')})")
 
         elif t == "ping":
             await self._send({"type": "pong"})
 
         elif t == "job_assign":
-            await self._handle_job(msg)
+            if msg.get("queue_hint"):
+                self._set_queue_hint(msg["queue_hint"])
+            # Run as a task so acks and pings keep flowing while it works
+            task = asyncio.create_task(self._handle_job(msg))
+            self._jobs.add(task)
+            task.add_done_callback(self._jobs.discard)
+
+        elif t in ("artifact_ack", "artifact_done"):
+            fut = self._replies.get(msg.get("transfer_id"))
+            if fut and not fut.done():
+                fut.set_result(msg)
+
+        elif t == "queue_hint":
+            self._set_queue_hint(msg)
 
         elif t == "command":
             await self._handle_command(msg)
@@ -235,6 +271,13 @@ class Worker:
         settings = msg.get("settings", {})
         loop = asyncio.get_running_loop()
 
+        # ── Fetch input image (before the GPU wait: the URL is short-lived) ──
+        image_path = os.path.join(config.TEMP_DIR, filename)
+        await loop.run_in_executor(
+            None, self._download_input,
+            msg["image_url"], image_path, msg["image_sha256"])
+        logger.info(f"Fetched input image: {image_path} ({msg.get('image_size', 0)} bytes)")
+
         # ── GPU check ──
         if self.force_next:
             self.force_next = False
@@ -255,13 +298,6 @@ class Worker:
 
             await loop.run_in_executor(None, _wait)
 
-        # ── Save input image ──
-        image_data = base64.b64decode(msg["image_base64"])
-        image_path = os.path.join(config.TEMP_DIR, filename)
-        with open(image_path, 'wb') as f:
-            f.write(image_data)
-        logger.info(f"Saved input image: {image_path} ({len(image_data)} bytes)")
-
         output_dir = os.path.join(config.TEMP_DIR, job_id)
 
         # ── Start GPU sampler ──
@@ -275,43 +311,72 @@ class Worker:
                 loop,
             )
 
+        # ── Preview callback: ship the coarse mesh as soon as it exists ──
+        def preview_cb(glb_path, face_count):
+            with open(glb_path, 'rb') as f:
+                glb_b64 = base64.b64encode(f.read()).decode('ascii')
+            asyncio.run_coroutine_threadsafe(
+                self._send({
+                    "type": "job_progress",
+                    "job_id": job_id,
+                    "step": "generating_mesh",
+                    "progress_pct": 55,
+                    "message": "Preview ready",
+                    "preview_glb_base64": glb_b64,
+                    "preview_face_count": face_count,
+                }),
+                loop,
+            )
+
         # ── Run pipeline in executor (blocking) ──
         try:
             result = await loop.run_in_executor(
                 None,
                 pipeline.run_pipeline,
-                image_path, output_dir, progress_cb, settings,
+                image_path, output_dir, progress_cb, settings, preview_cb,
             )
         finally:
             gpu_metrics = sampler.stop()
 
-        # ── Read output files ──
+        # ── Calibrate the VRAM model (skip retried jobs: peak is the OOM) ──
+        if (result.get('vram_baseline_mb') is not None
+                and gpu_metrics.get('peak_vram_mb') and not result['oom_retry']):
+            import vram_budget
+            vram_budget.record(result['octree_res'], result['steps'],
+                               result['vram_baseline_mb'], gpu_metrics['peak_vram_mb'])
+
+        # ── Upload output files ──
         try:
             stl_path = result['stl_path']
             glb_path = result['glb_path']
-
-            with open(stl_path, 'rb') as f:
-                stl_b64 = base64.b64encode(f.read()).decode('ascii')
-
-            glb_b64 = None
-            glb_filename = None
+            artifacts = {'stl': stl_path}
             if os.path.exists(glb_path):
-                with open(glb_path, 'rb') as f:
-                    glb_b64 = base64.b64encode(f.read()).decode('ascii')
-                glb_filename = Path(glb_path).name
+                artifacts['glb'] = glb_path
+            if os.path.exists(result['web_glb_path']):
+                artifacts['web_glb'] = result['web_glb_path']
+
+            for kind, path in artifacts.items():
+                if not await self._upload_artifact(job_id, kind, path):
+                    logger.info(f"Job {job_id} no longer wanted — dropping result")
+                    await self._send({
+                        "type": "job_failed", "job_id": job_id,
+                        "error": "Result refused by server", "step": "abandoned",
+                    })
+                    return
 
             # ── Send completion ──
-            await self._send({
+            await self._send_reliable({
                 "type": "job_complete",
                 "job_id": job_id,
                 "stl_filename": Path(stl_path).name,
-                "stl_base64": stl_b64,
-                "glb_filename": glb_filename,
-                "glb_base64": glb_b64,
+                "glb_filename": Path(glb_path).name if 'glb' in artifacts else None,
+                "artifacts": list(artifacts),
                 "vertex_count": result['vertex_count'],
                 "face_count": result['face_count'],
                 "is_watertight": result['is_watertight'],
+                "mesh_stats": result['mesh_stats'],
                 "generation_time_s": result['generation_time_s'],
+                "spans": result['spans'],
                 "gpu_metrics": gpu_metrics,
             })
 
@@ -331,6 +396,111 @@ class Worker:
                 pass
             shutil.rmtree(output_dir, ignore_errors=True)
 
+    # ── Input download ────────────────────────────────────────────────────
+
+    def _http_url(self, path: str) -> str:
+        """Resolve a server-relative path against VPS_HTTP_URL or the WS URL's host."""
+        base = config.VPS_HTTP_URL
+        if not base:
+            ws = urlsplit(self.url)
+            base = f"{'https' if ws.scheme == 'wss' else 'http'}://{ws.netloc}/"
+        return urljoin(base, path)
+
+    def _download_input(self, path: str, dest: str, sha256: str) -> None:
+        """
+        Stream the job's input image to dest (blocking; run in an executor).
+
+        Written to a temp file and only moved into place once its SHA-256
+        matches what job_assign announced. Retries INPUT_FETCH_RETRIES times.
+        """
+        request = urllib.request.Request(
+            self._http_url(path),
+            headers={"Authorization": f"Bearer {config.AUTH_TOKEN}"})
+        tmp = dest + '.part'
+        for attempt in range(1, config.INPUT_FETCH_RETRIES + 1):
+            h = hashlib.sha256()
+            try:
+                with urllib.request.urlopen(request, timeout=config.INPUT_FETCH_TIMEOUT_S) as resp, \
+                        open(tmp, 'wb') as f:
+                    while block := resp.read(64 * 1024):
+                        h.update(block)
+                        f.write(block)
+                if h.hexdigest() == sha256:
+                    os.replace(tmp, dest)
+                    return
+                logger.warning(f"Input image checksum mismatch (attempt {attempt})")
+            except OSError as e:  # URLError / HTTPError / socket timeouts
+                logger.warning(f"Input image download failed (attempt {attempt}): {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise RuntimeError(f"Could not fetch input image after {config.INPUT_FETCH_RETRIES} attempts")
+
+    # ── Artifact upload ───────────────────────────────────────────────────
+
+    async def _upload_artifact(self, job_id: str, kind: str, path: str) -> bool:
+        """
+        Stream one result file to the server as binary frames.
+
+        Each attempt sends artifact_begin (the server answers with the
+        offset it already holds), the remaining chunks, then artifact_end
+        with the file's SHA-256. A dropped connection or a short/corrupt
+        upload just starts another attempt, resuming at the server's
+        offset. Returns False if the server no longer wants the job.
+        """
+        loop = asyncio.get_running_loop()
+        transfer_id = uuid.uuid4()
+        size = os.path.getsize(path)
+        digest = await loop.run_in_executor(None, _file_sha256, path)
+
+        for attempt in range(1, config.ARTIFACT_MAX_RETRIES + 1):
+            try:
+                await asyncio.wait_for(self._connected.wait(), config.ARTIFACT_RESUME_WAIT_S)
+                ack = await self._request({
+                    "type": "artifact_begin", "transfer_id": transfer_id.hex,
+                    "job_id": job_id, "kind": kind, "size": size,
+                })
+                if ack.get("skip"):
+                    return False
+                if ack.get("error"):
+                    raise RuntimeError(f"Server refused {kind} upload: {ack['error']}")
+
+                offset, seq = ack["offset"], ack["seq"]
+                if offset:
+                    logger.info(f"Resuming {kind} upload at {offset / 1e6:.1f}/{size / 1e6:.1f}MB")
+                ws = self.ws
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    while offset < size:
+                        chunk = f.read(config.ARTIFACT_CHUNK_BYTES)
+                        await ws.send(CHUNK_HEADER.pack(transfer_id.bytes, seq, offset) + chunk)
+                        offset += len(chunk)
+                        seq += 1
+
+                done = await self._request({
+                    "type": "artifact_end", "transfer_id": transfer_id.hex, "sha256": digest,
+                })
+                if done.get("ok"):
+                    return True
+                logger.warning(f"{kind} upload attempt {attempt} incomplete: {done.get('error')}")
+            except (ConnectionError, websockets.ConnectionClosed, asyncio.TimeoutError) as e:
+                logger.warning(f"{kind} upload attempt {attempt} interrupted: {e!r}")
+
+        raise RuntimeError(f"{kind} upload failed after {config.ARTIFACT_MAX_RETRIES} attempts")
+
+    async def _request(self, msg: dict) -> dict:
+        """Send an artifact control message and wait for the reply to its transfer_id."""
+        if self.ws is None:
+            raise ConnectionError("not connected")
+        fut = asyncio.get_running_loop().create_future()
+        self._replies[msg["transfer_id"]] = fut
+        try:
+            await self.ws.send(json.dumps(msg))
+            return await asyncio.wait_for(fut, config.ARTIFACT_REPLY_TIMEOUT_S)
+        finally:
+            self._replies.pop(msg["transfer_id"], None)
+
     # ── Messaging ─────────────────────────────────────────────────────────
 
     async def _send_progress(self, job_id, step, pct, message):
@@ -351,18 +521,75 @@ class Worker:
             except Exception as e:
                 logger.warning(f"Send failed: {e}")
 
+    async def _send_reliable(self, data: dict):
+        """
+        Send a message that must not be lost, waiting out a dropped connection.
+
+        _send() gives up on a closed socket; for job_complete that would
+        leave the uploaded artifacts uncommitted and the job stuck in
+        processing. Each attempt waits for the (re)connection, whose
+        worker_hello re-claims the running job, then sends again.
+        """
+        for attempt in range(1, config.ARTIFACT_MAX_RETRIES + 1):
+            ws = None
+            try:
+                await asyncio.wait_for(self._connected.wait(), config.ARTIFACT_RESUME_WAIT_S)
+                ws = self.ws
+                await ws.send(json.dumps(data))
+                return
+            except (websockets.ConnectionClosed, asyncio.TimeoutError) as e:
+                logger.warning(f"{data['type']} send attempt {attempt} failed: {e!r}")
+                while ws is not None and self.ws is ws:
+                    await asyncio.sleep(0.1)  # until the serve loop drops the dead socket
+        raise RuntimeError(f"{data['type']} not sent after {config.ARTIFACT_MAX_RETRIES} attempts")
+
+    def _set_queue_hint(self, hint: dict):
+        self.queue_hint = {"pending": hint.get("pending", 0),
+                           "next_arrival_s": hint.get("next_arrival_s")}
+        self.queue_hint_at = time.time()
+
+    def _work_expected(self, within_s: float) -> bool:
+        """True if a fresh queue hint has jobs pending or one due within within_s."""
+        if (not self.queue_hint
+                or time.time() - self.queue_hint_at > config.QUEUE_HINT_MAX_AGE_S):
+            return False
+        eta = self.queue_hint["next_arrival_s"]
+        return self.queue_hint["pending"] > 0 or (eta is not None and eta <= within_s)
+
     async def _idle_unload_loop(self):
-        """Unload model immediately after job completes (no queue waiting)."""
+        """
+        Step the model down a tier when idle: hot → warm after
+        MODEL_HOT_IDLE_S, warm → cold after MODEL_WARM_IDLE_S or as soon
+        as free host RAM drops below WARM_MIN_FREE_RAM_GB.
+
+        The server's queue hint holds a tier: the model stays hot while
+        jobs are pending or one is predicted within KEEP_HOT_ARRIVAL_S,
+        and stays warm while one is predicted within MODEL_WARM_IDLE_S.
+        """
         while True:
             await asyncio.sleep(5)  # check frequently
-            if (self.last_job_finished
-                    and not self.current_job_id):
-                import pipeline
-                if pipeline.is_model_loaded():
-                    logger.info("No pending jobs — unloading model to free memory")
-                    loop = asyncio.get_running_loop()
-                    await loop.run_in_executor(None, pipeline.unload_model)
-                    self.last_job_finished = None
+            if not self.last_job_finished or self.current_job_id:
+                continue
+            import pipeline
+            loop = asyncio.get_running_loop()
+            idle = time.time() - self.last_job_finished
+            tier = pipeline.model_tier()
+
+            if tier == 'hot' and idle >= config.MODEL_HOT_IDLE_S:
+                if not self._work_expected(config.KEEP_HOT_ARRIVAL_S):
+                    logger.info("No pending jobs — parking model in host RAM")
+                    await loop.run_in_executor(None, pipeline.park_model)
+            elif tier == 'warm':
+                ram_gb = pipeline.host_ram_available_gb()
+                if ram_gb is not None and ram_gb < config.WARM_MIN_FREE_RAM_GB:
+                    await loop.run_in_executor(
+                        None, pipeline.unload_model, f"host RAM low ({ram_gb:.1f}GB free)")
+                elif (idle >= config.MODEL_WARM_IDLE_S
+                      and not self._work_expected(config.MODEL_WARM_IDLE_S)):
+                    await loop.run_in_executor(None, pipeline.unload_model, 'idle')
+
+            if pipeline.model_tier() == 'cold':
+                self.last_job_finished = None
 
     async def _heartbeat_loop(self):
         """Send GPU status every HEARTBEAT_INTERVAL_S seconds."""
@@ -378,10 +605,21 @@ class Worker:
                 "temp_c": status.get('temp_c', 0),
                 "available": not self.paused and not self.current_job_id,
                 "model_loaded": pipeline.is_model_loaded(),
+                "model_tier": pipeline.model_tier(),
+                "tier_changes": pipeline.drain_tier_changes(),
+                "last_reload": pipeline.last_reload(),
             }
             await self._send(payload)
 
 
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while block := f.read(config.ARTIFACT_CHUNK_BYTES):
+            h.update(block)
+    return h.hexdigest()
+
+
 # ── Entry point ───────────────────────────────────────────────────────────
 
 def main():